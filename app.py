@@ -1,17 +1,30 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
-import io
 import os
-import sqlite3
 from datetime import datetime, timedelta
-from urllib.parse import urljoin
+from functools import partial
 import hashlib
 import hmac
 import binascii
-import re
+
+from artes import (
+    CACHE_IMAGENS,
+    aquecer_templates,
+    arte_em_cache,
+    buscar_ultimas_materias,
+    PERFIL_PADRAO,
+    PERFIS,
+    gerar_arte,
+    gerar_lote_zip,
+    obter_titulo_limpo,
+)
+from layout_texto import CACHE_LAYOUT
+from banco import PoolConexoes
+from contadores import ler_contadores
+from manutencao import AgendadorManutencao
+from migracoes import migrar
+from eventos import CANAL_EVENTOS
+from medicao import HISTOGRAMA
+from pre_renderizacao import PRE_RENDERIZADOR, pre_renderizar
 
 # ============================================================
 # 1) CONFIGURAÇÃO DA PÁGINA
@@ -89,19 +102,14 @@ st.markdown(
 # ============================================================
 DB_PATH = os.getenv("DT_DB_PATH", "agenda_destaque.db")
 
-CAMINHO_FONTE = os.getenv("DT_FONTE_PATH", "Shoika Bold.ttf")
-TEMPLATE_FEED = os.getenv("DT_TEMPLATE_FEED", "template_feed.png")
-TEMPLATE_STORIE = os.getenv("DT_TEMPLATE_STORIE", "template_storie.png")
+# synchronous do SQLite: FULL (fsync a cada commit) ou NORMAL (em WAL, só nos checkpoints)
+DB_SINCRONISMO = os.getenv("DT_DB_SINCRONISMO", "FULL")
 
-HEADERS = {
-    "User-Agent": os.getenv(
-        "DT_USER_AGENT",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    )
-}
+# Com os avisos em tempo real (eventos.py) o autorefresh só cobre escritas de outros processos e a lista de notícias
+AUTOREFRESH_S = int(os.getenv("DT_AUTOREFRESH_S", "300"))
 
-REQUEST_TIMEOUT = int(os.getenv("DT_REQUEST_TIMEOUT", "12"))
+# Quem vê o painel de desempenho na barra lateral (separado por vírgula)
+ADMINS = {u.strip() for u in os.getenv("DT_ADMINS", "juan").split(",") if u.strip()}
 
 # ============================================================
 # 4) SEGURANÇA: SENHAS (SEM HARDCODE)
@@ -148,296 +156,79 @@ AUTH_CONFIG_OK = bool(AUTH_HASHES.get("juan")) and bool(AUTH_HASHES.get("brayan"
 # ============================================================
 # 5) BANCO DE DADOS (AJUSTADO PARA PERSISTÊNCIA TOTAL)
 # ============================================================
-def get_conn():
-    # Aumentado o timeout para 10 segundos para evitar travamentos em escritas rápidas
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=10)
-    
-    # Ativa o modo WAL para permitir leitura e escrita simultâneas
-    conn.execute("PRAGMA journal_mode=WAL;")
-    
-    # Mudado de NORMAL para FULL: Garante que o sistema espere o dado gravar no disco físico
-    conn.execute("PRAGMA synchronous=FULL;")
-    
-    conn.execute("PRAGMA busy_timeout=5000;")
-    return conn
+@st.cache_resource
+def pool_db() -> PoolConexoes:
+    # Um pool por processo: as conexões (WAL, synchronous, busy_timeout e comandos
+    # preparados) sobrevivem aos reruns. Cada comando é cronometrado (painel de desempenho)
+    return PoolConexoes(DB_PATH, DB_SINCRONISMO, busy_timeout_ms=10000)
 
+def get_conn():
+    # conn.close() só devolve a conexão ao pool (desfazendo o que ficou sem commit)
+    return pool_db().conexao()
+
+def revisoes_db() -> dict:
+    # {tabela: revisão}; triggers somam 1 a cada escrita (migração 5)
+    return dict(get_conn().execute("SELECT tabela, revisao FROM revisoes").fetchall())
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def consultar(sql: str, parametros: tuple, revisao: int) -> list:
+    # ``revisao`` só entra na chave: enquanto ninguém escreve na tabela, os reruns
+    # (autorefresh de 30 s de cada sessão) reaproveitam o resultado sem tocar no banco
+    return get_conn().execute(sql, parametros).fetchall()
+
+def avisar(topico: str, acao: str, **dados):
+    # Depois do commit: as outras sessões abertas redesenham em até 1 s
+    CANAL_EVENTOS.publicar(topico, acao, perfil=st.session_state.get("perfil"), **dados)
+
+@st.fragment(run_every=1)
+def escutar_mudancas():
+    # Único trecho que roda a cada segundo: compara dois números em memória, sem banco nem desenho
+    if CANAL_EVENTOS.sequencia() > st.session_state.get("eventos_vistos", 0):
+        st.rerun(scope="app")
+
+@st.cache_resource
 def init_db():
+    # Tabelas, índices e triggers versionados (migracoes.py); uma vez por processo.
+    # Erro sobe de propósito: o cache_resource não guarda exceção e o próximo rerun tenta de novo
     conn = get_conn()
     try:
-        c = conn.cursor()
-
-        # Tabela antiga (mantida por compatibilidade)
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS agenda (
-                dia TEXT PRIMARY KEY,
-                pauta TEXT
-            )
-            """
-        )
-
-        # Pautas do Brayan
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS pautas_trabalho (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                titulo TEXT,
-                link_ref TEXT,
-                status TEXT,
-                data_envio TEXT,
-                prioridade TEXT,
-                observacao TEXT
-            )
-            """
-        )
-
-        # Agenda unificada
-        c.execute(
-            """
-            CREATE TABLE IF NOT EXISTS agenda_itens (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                data_ref TEXT NOT NULL,
-                titulo TEXT NOT NULL,
-                descricao TEXT,
-                status TEXT NOT NULL DEFAULT 'Pendente',
-                criado_por TEXT,
-                criado_em TEXT
-            )
-            """
-        )
-
-        conn.commit()
-        # COMANDO CRÍTICO: Força o SQLite a transferir tudo do log temporário para o arquivo .db real
-        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
-    except Exception as e:
-        print(f"Erro ao inicializar banco: {e}")
+        aplicadas = migrar(conn)
+        if aplicadas:
+            print(f"Banco migrado para a versão {aplicadas[-1]}")
     finally:
         conn.close()
 
-# Inicializa o banco garantindo a estrutura
-init_db()
-
-# ============================================================
-# 6) HTTP HELPERS (COM TIMEOUT + TRATAMENTO)
-# ============================================================
-@st.cache_resource(show_spinner=False)
-def get_requests_session(headers: dict):
-    s = requests.Session()
-    s.headers.update(headers)
-    return s
-
-SESSION = get_requests_session(HEADERS)
+@st.cache_resource
+def agendador_manutencao() -> AgendadorManutencao:
+    # Limpeza da agenda, checkpoint do WAL e vacuum incremental fora dos reruns
+    return AgendadorManutencao(pool_db())
 
-def safe_get_text(url: str) -> str:
-    try:
-        r = SESSION.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
-        r.raise_for_status()
-        if not r.encoding:
-            r.encoding = r.apparent_encoding or "utf-8"
-        return r.text
-    except requests.exceptions.Timeout:
-        raise RuntimeError("Tempo limite excedido ao acessar a página.")
-    except requests.exceptions.RequestException as e:
-        raise RuntimeError(f"Falha HTTP ao acessar a página: {e}")
-
-def safe_get_bytes(url: str) -> bytes:
-    try:
-        r = SESSION.get(url, timeout=REQUEST_TIMEOUT, stream=True, allow_redirects=True)
-        r.raise_for_status()
-        return r.content
-    except requests.exceptions.Timeout:
-        raise RuntimeError("Tempo limite excedido ao baixar a imagem.")
-    except requests.exceptions.RequestException as e:
-        raise RuntimeError(f"Falha HTTP ao baixar a imagem: {e}")
+# Inicializa o banco garantindo a estrutura
+try:
+    init_db()
+except Exception as e:
+    print(f"Erro ao inicializar banco: {e}")
+    st.error(f"Erro ao inicializar o banco de dados: {e}. Atualize a página para tentar de novo.")
+    st.stop()
+agendador_manutencao().iniciar()
 
 # ============================================================
-# 7) SCRAPING + ARTE (ROBUSTO)
+# 6) ARTES (RENDERIZAÇÃO FICA EM artes.py, SEM STREAMLIT)
 # ============================================================
-def extrair_titulo(soup: BeautifulSoup) -> str:
-    h1 = soup.find("h1")
-    if h1:
-        t = h1.get_text(" ", strip=True)
-        if t:
-            return t
-    if soup.title and soup.title.get_text(strip=True):
-        return soup.title.get_text(strip=True)
-    return "Sem título"
-
-def normalizar_url(base: str, candidate: str) -> str:
-    if not candidate:
-        return ""
-    return urljoin(base, candidate)
-
-def encontrar_primeira_imagem_util(base_url: str, soup: BeautifulSoup) -> str:
-    candidatos = []
-    corpo = soup.find(class_="post-body") or soup.find("article") or soup
-
-    for img in corpo.find_all("img"):
-        src = (img.get("src") or "").strip()
-        data_src = (img.get("data-src") or "").strip()
-        data_lazy = (img.get("data-lazy-src") or "").strip()
-        pick = src or data_src or data_lazy
-        if not pick:
-            continue
-
-        full = normalizar_url(base_url, pick)
-        low = full.lower()
-
-        if "logo" in low or "icon" in low or "sprite" in low:
-            continue
-
-        if not re.search(r"\.(jpg|jpeg|png|webp)(\?|$)", low):
-            candidatos.append(full)
-            continue
-
-        return full
-
-    return candidatos[0] if candidatos else ""
-
-def garantir_fonte():
-    if not os.path.exists(CAMINHO_FONTE):
-        raise FileNotFoundError(
-            f"Fonte não encontrada: {CAMINHO_FONTE}. "
-            f"Ajuste DT_FONTE_PATH ou coloque o arquivo no mesmo diretório."
-        )
-
-def aplicar_template_se_existir(base_img: Image.Image, template_path: str, size: tuple):
-    if os.path.exists(template_path):
-        tmp = Image.open(template_path).convert("RGBA").resize(size)
-        base_img.alpha_composite(tmp)
-
-def processar_artes_integrado(url: str, tipo_solicitado: str, titulo_personalizado: str = None) -> Image.Image:
-    garantir_fonte()
-
-    html = safe_get_text(url)
-    soup = BeautifulSoup(html, "html.parser")
-
-    # --- AJUSTE AQUI: Lógica de escolha do título ---
-    titulo_site = extrair_titulo(soup)
-    # Se você digitou algo na caixa, usamos o seu. Se estiver vazio, usa o do site.
-    titulo = titulo_personalizado if titulo_personalizado and titulo_personalizado.strip() != "" else titulo_site
-    
-    img_url = encontrar_primeira_imagem_util(url, soup)
-
-    if not img_url:
-        raise ValueError("Não foi encontrada uma imagem válida na matéria.")
-
-    img_original = Image.open(io.BytesIO(safe_get_bytes(img_url))).convert("RGBA")
-    larg_o, alt_o = img_original.size
-    prop_o = larg_o / alt_o
-
-    if tipo_solicitado == "FEED":
-        TAMANHO_FEED = 1000
-        if prop_o > 1.0:
-            n_alt = TAMANHO_FEED
-            n_larg = int(n_alt * prop_o)
-            img_redim = img_original.resize((n_larg, n_alt), Image.LANCZOS)
-            margem = (n_larg - TAMANHO_FEED) // 2
-            fundo = img_redim.crop((margem, 0, margem + TAMANHO_FEED, TAMANHO_FEED))
-        else:
-            n_larg = TAMANHO_FEED
-            n_alt = int(n_larg / prop_o)
-            img_redim = img_original.resize((n_larg, n_alt), Image.LANCZOS)
-            margem = (n_alt - TAMANHO_FEED) // 2
-            fundo = img_redim.crop((0, margem, TAMANHO_FEED, margem + TAMANHO_FEED))
-
-        fundo = fundo.convert("RGBA")
-        aplicar_template_se_existir(fundo, TEMPLATE_FEED, (TAMANHO_FEED, TAMANHO_FEED))
-        draw = ImageDraw.Draw(fundo)
-
-        tam = 85
-        while tam > 20:
-            fonte = ImageFont.truetype(CAMINHO_FONTE, tam)
-            try: limite = int(662 / (fonte.getlength("W") * 0.55))
-            except: limite = 26
-            
-            # O textwrap agora usa o 'titulo' que pode ser o seu editado
-            linhas = textwrap.wrap(titulo, width=max(10, limite))
-            alt_bloco = (len(linhas) * tam) + ((len(linhas) - 1) * 4)
-            if alt_bloco <= 165 and len(linhas) <= 3:
-                break
-            tam -= 1
-
-        y = 811 - (alt_bloco // 2)
-        for lin in linhas:
-            bbox = draw.textbbox((0, 0), lin, font=fonte)
-            larg_l = bbox[2] - bbox[0]
-            draw.text((488 - (larg_l // 2), y), lin, fill="black", font=fonte)
-            y += tam + 4
-        return fundo.convert("RGB")
-
-    # STORY
-    LARG_STORY, ALT_STORY = 940, 541
-    ratio_a = LARG_STORY / ALT_STORY
-    if prop_o > ratio_a:
-        ns_alt = ALT_STORY
-        ns_larg = int(ns_alt * prop_o)
-    else:
-        ns_larg = LARG_STORY
-        ns_alt = int(ns_larg / prop_o)
-
-    img_redim = img_original.resize((ns_larg, ns_alt), Image.LANCZOS)
-    l_cut = (ns_larg - LARG_STORY) / 2
-    t_cut = (ns_alt - ALT_STORY) / 2
-    img_final = img_redim.crop((l_cut, t_cut, l_cut + LARG_STORY, t_cut + ALT_STORY))
-    
-    storie_canvas = Image.new("RGBA", (1080, 1920), (0, 0, 0, 255))
-    storie_canvas.paste(img_final, (69, 504))
-    aplicar_template_se_existir(storie_canvas, TEMPLATE_STORIE, (1080, 1920))
-
-    draw_s = ImageDraw.Draw(storie_canvas)
-    tam_s = 60
-    while tam_s > 20:
-        fonte_s = ImageFont.truetype(CAMINHO_FONTE, tam_s)
-        try: limite_s = int(912 / (fonte_s.getlength("W") * 0.55))
-        except: limite_s = 34
-        
-        # O textwrap do story também usa o seu 'titulo' editado
-        linhas_s = textwrap.wrap(titulo, width=max(10, limite_s))
-        alt_bloco_s = (len(linhas_s) * tam_s) + (len(linhas_s) * 10)
-        if alt_bloco_s <= 300 and len(linhas_s) <= 4:
-            break
-        tam_s -= 2
-
-    y_s = 1079
-    for lin in linhas_s:
-        draw_s.text((69, y_s), lin, fill="white", font=fonte_s)
-        y_s += tam_s + 12
-
-    return storie_canvas.convert("RGB")
+aquecer_templates()
 
 # ============================================================
-# 8) BUSCAR ÚLTIMAS (COM CACHE + URL ABSOLUTA)
+# 7) BUSCAR ÚLTIMAS (COM CACHE)
 # ============================================================
 @st.cache_data(ttl=120)
 def buscar_ultimas():
     try:
-        base = "https://www.destaquetoledo.com.br/"
-        html = safe_get_text(base)
-        soup = BeautifulSoup(html, "html.parser")
-
-        news = []
-        for a in soup.find_all("a", href=True):
-            href = (a.get("href") or "").strip()
-            if ".html" in href and "/20" in href:
-                t = a.get_text(strip=True)
-                if t and len(t) > 25:
-                    news.append({"t": t, "u": urljoin(base, href)})
-
-        seen = set()
-        out = []
-        for item in news:
-            if item["u"] in seen:
-                continue
-            seen.add(item["u"])
-            out.append(item)
-
-        return out[:12]
+        return buscar_ultimas_materias()
     except Exception:
         return []
 
 # ============================================================
-# 9) LOGIN (VERSÃO OTIMIZADA E MODERNA)
+# 8) LOGIN (VERSÃO OTIMIZADA E MODERNA)
 # ============================================================
 if "autenticado" not in st.session_state:
     st.session_state.autenticado = False
@@ -504,24 +295,25 @@ if not st.session_state.autenticado:
 
 else:
     # ============================================================
-    # 10) INTERFACE INTERNA
+    # 9) INTERFACE INTERNA
     # ============================================================
-    # Sistema automático (30 segundos) - Não mexe no layout
+    # Reserva (escritas de outros processos, notícias novas) - Não mexe no layout
     try:
         from streamlit_autorefresh import st_autorefresh
-        st_autorefresh(interval=30000, key="refresh_juan")
+        st_autorefresh(interval=AUTOREFRESH_S * 1000, key="refresh_juan")
     except:
         pass
-
-    # Função auxiliar interna para garantir que o título seja carregado para edição
-    def obter_titulo_limpo(url):
-        try:
-            r = requests.get(url, timeout=5)
-            s = BeautifulSoup(r.text, 'html.parser')
-            t = s.find('title').text
-            return t.replace(' - Destaque Toledo', '').strip()
-        except:
-            return ""
+    # Tempo real: marca o que esta sessão já viu ANTES de consultar; evento publicado
+    # daqui em diante faz o escutar_mudancas() pedir outro rerun
+    eventos_vistos = st.session_state.get("eventos_vistos", CANAL_EVENTOS.sequencia())
+    st.session_state.eventos_vistos = CANAL_EVENTOS.sequencia()
+    for ev in CANAL_EVENTOS.desde(eventos_vistos):
+        if ev["topico"] == "pautas" and ev["perfil"] != st.session_state.perfil:
+            rotulo = {"nova": "🆕 Nova pauta", "postando": "⚡ Postando agora", "concluida": "✅ Postada", "removida": "🗑️ Removida"}[ev["acao"]]
+            st.toast(f"{rotulo}: {ev['titulo']}")
+    escutar_mudancas()
+    # Sinal de mudança: a única leitura do banco num tick sem novidades
+    REVISOES = revisoes_db()
 
     st.markdown('<div class="topo-titulo"><h1>DESTAQUE TOLEDO</h1></div>', unsafe_allow_html=True)
 
@@ -543,16 +335,42 @@ else:
                     st.subheader("📰 Notícias Recentes")
                 with col_t2:
                     if st.button("🔄 Atualizar", key="up_artes"):
-                        st.cache_data.clear()
+                        # Só a lista de notícias; com o feed, nada novo custa um 304
+                        buscar_ultimas.clear()
                         st.rerun()
 
                 ultimas = buscar_ultimas()
+                # Baixa e pré-gera em segundo plano as matérias novas da lista
+                pre_renderizar(item["u"] for item in ultimas)
                 if not ultimas:
                     st.info("Não foi possível carregar as notícias agora.")
                 for i, item in enumerate(ultimas):
                     if st.button(item["t"], key=f"btn_{i}", use_container_width=True):
                         st.session_state.url_atual = item["u"]
 
+                if ultimas:
+                    with st.expander("📦 Gerar em lote (FEED + STORY)"):
+                        titulos_lote = {item["t"]: item["u"] for item in ultimas}
+                        escolhidos = st.multiselect(
+                            "Matérias:", list(titulos_lote), default=list(titulos_lote), key="lote_sel"
+                        )
+                        if st.button("⚡ GERAR LOTE", use_container_width=True, disabled=not escolhidos):
+                            with st.spinner(f"Gerando {len(escolhidos)} matérias..."):
+                                zip_bytes, erros_lote = gerar_lote_zip(
+                                    [titulos_lote[t] for t in escolhidos],
+                                    perfil=st.session_state.get("perfil_download"),
+                                )
+                            for u_err, msg in erros_lote:
+                                st.warning(f"Falha em {u_err}: {msg}")
+                            if len(erros_lote) < len(escolhidos):
+                                st.download_button(
+                                    "📥 BAIXAR ZIP",
+                                    zip_bytes,
+                                    "artes_destaque.zip",
+                                    mime="application/zip",
+                                    use_container_width=True,
+                                )
+
             with col_preview:
                 url_f = st.text_input("Link da Matéria:", value=st.session_state.get("url_atual", ""))
 
@@ -564,41 +382,57 @@ else:
                     # Caixa para editar o texto (mudar frase, dar espaço, etc)
                     titulo_editado = st.text_area("📝 Ajuste o título da arte se desejar:", value=titulo_sugerido, height=100)
 
-                    ca, cb = st.columns(2)
+                    perfil_dl = st.selectbox(
+                        "Formato do download:",
+                        list(PERFIS),
+                        index=list(PERFIS).index(PERFIL_PADRAO),
+                        format_func=lambda nome: PERFIS[nome].rotulo,
+                        key="perfil_download",
+                    )
 
-                    if ca.button("🖼️ GERAR FEED", use_container_width=True, type="primary"):
-                        try:
-                            # Passa o seu texto editado para a arte
-                            img = processar_artes_integrado(url_f, "FEED", titulo_personalizado=titulo_editado)
-                            st.image(img)
-
-                            buf = io.BytesIO()
-                            img.save(buf, "JPEG", quality=95, optimize=True)
-                            st.download_button(
-                                "📥 BAIXAR FEED",
-                                buf.getvalue(),
-                                "feed.jpg",
-                                use_container_width=True,
-                            )
-                        except Exception as e:
-                            st.error(f"Falha ao gerar FEED: {e}")
+                    ca, cb, cc = st.columns(3)
 
+                    # As artes geradas ficam na sessão e os JPEGs no cache de artes:
+                    # clicar em baixar ou o autorefresh não apagam a prévia
+                    geradas = st.session_state.setdefault("artes_geradas", {})
+                    if ca.button("🖼️ GERAR FEED", use_container_width=True, type="primary"):
+                        # Passa o seu texto editado para a arte
+                        geradas["FEED"] = (url_f, titulo_editado)
                     if cb.button("📱 GERAR STORY", use_container_width=True):
-                        try:
-                            # Passa o seu texto editado para a arte
-                            img = processar_artes_integrado(url_f, "STORY", titulo_personalizado=titulo_editado)
-                            st.image(img, width=280)
-
-                            buf = io.BytesIO()
-                            img.save(buf, "JPEG", quality=95, optimize=True)
-                            st.download_button(
-                                "📥 BAIXAR STORY",
-                                buf.getvalue(),
-                                "story.jpg",
-                                use_container_width=True,
-                            )
-                        except Exception as e:
-                            st.error(f"Falha ao gerar STORY: {e}")
+                        geradas["STORY"] = (url_f, titulo_editado)
+                    if cc.button("🧩 GERAR AMBOS", use_container_width=True):
+                        # Uma busca e uma decodificação para os dois formatos
+                        geradas["FEED"] = geradas["STORY"] = (url_f, titulo_editado)
+
+                    # Manchete já pré-gerada com o título sugerido: mostra a prévia sem esperar o clique em gerar
+                    if not any(t in geradas and geradas[t][0] == url_f for t in ("FEED", "STORY")):
+                        if all(arte_em_cache(url_f, t, titulo_editado, perfil="previa") for t in ("FEED", "STORY")):
+                            geradas["FEED"] = geradas["STORY"] = (url_f, titulo_editado)
+                            st.caption("⚡ Prévia pré-gerada")
+
+                    visiveis = [t for t in ("FEED", "STORY") if t in geradas and geradas[t][0] == url_f]
+                    if visiveis:
+                        colunas = st.columns([2, 1]) if len(visiveis) == 2 else [st.container()]
+                        for col, tipo in zip(colunas, visiveis):
+                            with col:
+                                try:
+                                    previa = gerar_arte(url_f, tipo, geradas[tipo][1], perfil="previa")
+                                except Exception as e:
+                                    st.error(f"Falha ao gerar {tipo}: {e}")
+                                    continue
+                                if tipo == "STORY":
+                                    st.image(previa, width=280)
+                                else:
+                                    st.image(previa)
+                                # O arquivo final só é codificado quando o download é pedido
+                                st.download_button(
+                                    f"📥 BAIXAR {tipo}",
+                                    partial(gerar_arte, url_f, tipo, geradas[tipo][1], perfil_dl),
+                                    f"{tipo.lower()}.{PERFIS[perfil_dl].extensao}",
+                                    mime=PERFIS[perfil_dl].mime,
+                                    key=f"dl_{tipo.lower()}",
+                                    use_container_width=True,
+                                )
 
         with tab2:
             st.markdown(
@@ -618,18 +452,16 @@ else:
                 if st.form_submit_button("🚀 ENVIAR PARA O BRAYAN", use_container_width=True):
                     if f_titulo:
                         hora_br = (datetime.utcnow() - timedelta(hours=3)).strftime("%H:%M")
-                        conn = get_conn()
-                        c = conn.cursor()
-                        c.execute(
-                            """
-                            INSERT INTO pautas_trabalho
-                            (titulo, link_ref, status, data_envio, prioridade, observacao)
-                            VALUES (?,?,'Pendente',?,?,?)
-                            """,
-                            (f_titulo, f_link if f_link else "Sem link", hora_br, f_urgencia, f_obs),
-                        )
-                        conn.commit()
-                        conn.close()
+                        with pool_db().transacao() as conn:
+                            conn.execute(
+                                """
+                                INSERT INTO pautas_trabalho
+                                (titulo, link_ref, status, data_envio, prioridade, observacao)
+                                VALUES (?,?,'Pendente',?,?,?)
+                                """,
+                                (f_titulo, f_link if f_link else "Sem link", hora_br, f_urgencia, f_obs),
+                            )
+                        avisar("pautas", "nova", titulo=f_titulo)
                         st.success(f"✅ Matéria enviada para o Brayan!")
                         st.rerun()
                     else:
@@ -645,11 +477,10 @@ else:
                 if st.button("🔄 Atualizar Fila", key="up_fila"):
                     st.rerun()
             
-            conn = get_conn()
-            c = conn.cursor()
-            c.execute("SELECT id, titulo, prioridade, data_envio, status FROM pautas_trabalho WHERE status != 'Concluído' ORDER BY id DESC LIMIT 10")
-            monitor = c.fetchall()
-            conn.close()
+            monitor = consultar(
+                "SELECT id, titulo, prioridade, data_envio, status FROM pautas_trabalho WHERE status != 'Concluído' ORDER BY id DESC LIMIT 10",
+                (), REVISOES["pautas_trabalho"],
+            )
 
             if not monitor:
                 st.info("Tudo em dia! Nenhuma postagem pendente.")
@@ -669,11 +500,9 @@ else:
                         st.markdown(f"<p style='color:{status_cor}; font-weight:bold; margin-top:10px;'>{status_txt}</p>", unsafe_allow_html=True)
                     with col_m3:
                         if st.button("Remover", key=f"ex_{p[0]}", use_container_width=True):
-                            conn = get_conn()
-                            c = conn.cursor()
-                            c.execute("DELETE FROM pautas_trabalho WHERE id=?", (p[0],))
-                            conn.commit()
-                            conn.close()
+                            with pool_db().transacao() as conn:
+                                conn.execute("DELETE FROM pautas_trabalho WHERE id=?", (p[0],))
+                            avisar("pautas", "removida", id=p[0], titulo=p[1])
                             st.rerun()
 
         # ============================================================
@@ -685,9 +514,7 @@ else:
             hoje_dt = (datetime.utcnow() - timedelta(hours=3)).date()
             hoje_str = hoje_dt.strftime("%Y-%m-%d")
 
-            # 1) LIMPEZA AUTOMÁTICA
-            c.execute("DELETE FROM agenda_itens WHERE status = 'Concluído' AND data_ref < ?", (hoje_str,))
-            conn.commit()
+            # 1) LIMPEZA AUTOMÁTICA: fica com o agendador de manutenção (manutencao.py), uma vez por dia
 
             # 2) CABEÇALHO COMPACTO
             col_tit, col_btn = st.columns([3, 1])
@@ -706,7 +533,7 @@ else:
                                 agora = (datetime.utcnow() - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M")
                                 c.execute("INSERT INTO agenda_itens (data_ref, titulo, descricao, status, criado_por, criado_em) VALUES (?, ?, ?, ?, ?, ?)",
                                     (ndat.strftime("%Y-%m-%d"), ntit, ndes, "Pendente", st.session_state.perfil, agora))
-                                conn.commit(); st.rerun()
+                                conn.commit(); avisar("agenda", "novo"); st.rerun()
 
             # 3) FILTRO
             opcao_filtro = st.selectbox("Período:", ["Próximos 7 dias", "Próximos 15 dias", "Próximos 30 dias", "Tudo"], label_visibility="collapsed")
@@ -715,10 +542,9 @@ else:
             data_limite_filtro = (hoje_dt + timedelta(days=dias_limite)).strftime("%Y-%m-%d")
 
             # 4) BUSCA
-            c.execute("""SELECT id, data_ref, titulo, descricao, status, criado_por FROM agenda_itens 
+            itens = consultar("""SELECT id, data_ref, titulo, descricao, status, criado_por FROM agenda_itens 
                          WHERE (data_ref BETWEEN ? AND ?) OR (status = 'Pendente' AND data_ref < ?)
-                         ORDER BY status DESC, data_ref ASC""", (hoje_str, data_limite_filtro, hoje_str))
-            itens = c.fetchall()
+                         ORDER BY status DESC, data_ref ASC""", (hoje_str, data_limite_filtro, hoje_str), REVISOES["agenda_itens"])
 
             if not itens:
                 st.info("✨ Nada agendado.")
@@ -753,7 +579,7 @@ else:
                         with b1:
                             if st.button("✅" if status == "Pendente" else "↩️", key=f"ok_{tid}", use_container_width=True):
                                 c.execute("UPDATE agenda_itens SET status=? WHERE id=?", ("Concluído" if status == "Pendente" else "Pendente", tid))
-                                conn.commit(); st.rerun()
+                                conn.commit(); avisar("agenda", "status", id=tid); st.rerun()
                         with b2:
                             with st.popover("📝", use_container_width=True):
                                 with st.form(f"ed_{tid}"):
@@ -763,10 +589,10 @@ else:
                                     ns = st.text_area("Obs", value=descricao if descricao else "")
                                     if st.form_submit_button("Salvar"):
                                         c.execute("UPDATE agenda_itens SET titulo=?, data_ref=?, descricao=? WHERE id=?", (nt, nd.strftime("%Y-%m-%d"), ns, tid))
-                                        conn.commit(); st.rerun()
+                                        conn.commit(); avisar("agenda", "editado", id=tid); st.rerun()
                                     if st.form_submit_button("🗑️ Excluir"):
                                         c.execute("DELETE FROM agenda_itens WHERE id=?", (tid,))
-                                        conn.commit(); st.rerun()
+                                        conn.commit(); avisar("agenda", "removido", id=tid); st.rerun()
                         with b3:
                             if descricao:
                                 with st.popover("ℹ️", use_container_width=True):
@@ -815,11 +641,10 @@ else:
             st.markdown(f"<h1 style='margin-bottom:0;'>Controle de Operações</h1>", unsafe_allow_html=True)
             st.markdown(f"<p style='color:#666; font-size:1.1rem;'>Bem-vindo, <b>Brayan</b>. Status do sistema: <span style='color:green;'>● Online</span></p>", unsafe_allow_html=True)
         
-        # KPIs
-        c.execute("SELECT COUNT(*) FROM pautas_trabalho WHERE status != 'Concluído'")
-        pautas_ativas = c.fetchone()[0]
-        c.execute("SELECT COUNT(*) FROM agenda_itens WHERE status = 'Pendente' AND criado_por = 'brayan'")
-        agenda_trabalho = c.fetchone()[0]
+        # KPIs: contadores mantidos por triggers (contadores.py), sem COUNT(*) a cada rerun
+        kpis = ler_contadores(conn, "pautas_abertas", "agenda_pendente:brayan")
+        pautas_ativas = kpis["pautas_abertas"]
+        agenda_trabalho = kpis["agenda_pendente:brayan"]
 
         k1, k2 = st.columns(2)
         with k1:
@@ -832,12 +657,11 @@ else:
 
         # --- ABA 1: TRABALHO (CORREÇÃO DE CLIQUE ÚNICO) ---
         with t_work:
-            c.execute("""
+            items = consultar("""
                 SELECT id, titulo, link_ref, prioridade, data_envio, observacao, status 
                 FROM pautas_trabalho WHERE status != 'Concluído' 
                 ORDER BY CASE WHEN prioridade = 'URGENTE' THEN 1 WHEN prioridade = 'Normal' THEN 2 ELSE 3 END ASC, id DESC
-            """)
-            items = c.fetchall()
+            """, (), REVISOES["pautas_trabalho"])
             if not items:
                 st.info("✨ Sistema limpo. Sem pautas pendentes.")
             for id_p, tit, link, prio, hora, obs, stat in items:
@@ -868,6 +692,7 @@ else:
                             # Atualiza status silenciosamente
                             c.execute("UPDATE pautas_trabalho SET status='Postando' WHERE id=?", (id_p,))
                             conn.commit()
+                            avisar("pautas", "postando", id=id_p, titulo=tit)
                             # Aguarda um milissegundo antes do rerun para o JS processar a janela
                             st.rerun()
                         else:
@@ -876,7 +701,7 @@ else:
                 with c2:
                     if st.button("✅ FEITO", key=f"ok_{id_p}", use_container_width=True):
                         c.execute("UPDATE pautas_trabalho SET status='Concluído' WHERE id=?", (id_p,))
-                        conn.commit(); st.rerun()
+                        conn.commit(); avisar("pautas", "concluida", id=id_p, titulo=tit); st.rerun()
                 with c3:
                     if obs:
                         with st.expander("📄 Ver Conteúdo"): st.write(obs)
@@ -893,12 +718,10 @@ else:
             dt_lim_str = (hoje_dt + timedelta(days=d_lim)).strftime("%Y-%m-%d")
 
             # SQL CORRIGIDO: Puxa tudo que está atrasado (independente do filtro) OU dentro do limite de dias
-            c.execute("""SELECT id, data_ref, titulo, descricao FROM agenda_itens 
+            itens_work = consultar("""SELECT id, data_ref, titulo, descricao FROM agenda_itens 
                          WHERE status = 'Pendente' AND criado_por = 'brayan' 
                          AND (data_ref < ? OR data_ref <= ?) 
-                         ORDER BY data_ref ASC""", (hoje_str, dt_lim_str))
-            
-            itens_work = c.fetchall()
+                         ORDER BY data_ref ASC""", (hoje_str, dt_lim_str), REVISOES["agenda_itens"])
             if not itens_work:
                 st.write("✨ Nenhuma atividade de trabalho pendente.")
             else:
@@ -928,7 +751,7 @@ else:
                         with btn_c1:
                             if st.button("✅", key=f"at_{tid}", use_container_width=True):
                                 c.execute("UPDATE agenda_itens SET status='Concluído' WHERE id=?", (tid,))
-                                conn.commit(); st.rerun()
+                                conn.commit(); avisar("agenda", "concluido", id=tid); st.rerun()
                         with btn_c2:
                             with st.popover("📝", use_container_width=True):
                                 with st.form(f"f_ed_w_{tid}"):
@@ -937,7 +760,7 @@ else:
                                     ns = st.text_area("Obs", value=d if d else "")
                                     if st.form_submit_button("Salvar"):
                                         c.execute("UPDATE agenda_itens SET titulo=?, data_ref=?, descricao=? WHERE id=?", (nt, nd.strftime("%Y-%m-%d"), ns, tid))
-                                        conn.commit(); st.rerun()
+                                        conn.commit(); avisar("agenda", "editado", id=tid); st.rerun()
                         with btn_c3:
                             if d:
                                 with st.popover("ℹ️", use_container_width=True): st.write(d)
@@ -955,12 +778,10 @@ else:
             dt_limp_str = (hoje_dt + timedelta(days=d_limp)).strftime("%Y-%m-%d")
 
             # SQL CORRIGIDO: Puxa tudo que está atrasado OU dentro do limite de dias
-            c.execute("""SELECT id, data_ref, titulo, descricao FROM agenda_itens 
+            itens_pess = consultar("""SELECT id, data_ref, titulo, descricao FROM agenda_itens 
                          WHERE status = 'Pendente' AND criado_por = 'brayan_pessoal' 
                          AND (data_ref < ? OR data_ref <= ?) 
-                         ORDER BY data_ref ASC""", (hoje_str, dt_limp_str))
-            
-            itens_pess = c.fetchall()
+                         ORDER BY data_ref ASC""", (hoje_str, dt_limp_str), REVISOES["agenda_itens"])
             if not itens_pess:
                 st.info("✨ Vida pessoal organizada no período.")
             else:
@@ -990,7 +811,7 @@ else:
                         with btn_p1:
                             if st.button("✅", key=f"ps_ok_{tid}", use_container_width=True):
                                 c.execute("UPDATE agenda_itens SET status='Concluído' WHERE id=?", (tid,))
-                                conn.commit(); st.rerun()
+                                conn.commit(); avisar("agenda", "concluido", id=tid); st.rerun()
                         with btn_p2:
                             with st.popover("📝", use_container_width=True):
                                 with st.form(f"f_ed_p_{tid}"):
@@ -999,7 +820,7 @@ else:
                                     ns = st.text_area("Obs", value=d if d else "")
                                     if st.form_submit_button("Salvar"):
                                         c.execute("UPDATE agenda_itens SET titulo=?, data_ref=?, descricao=? WHERE id=?", (nt, nd.strftime("%Y-%m-%d"), ns, tid))
-                                        conn.commit(); st.rerun()
+                                        conn.commit(); avisar("agenda", "editado", id=tid); st.rerun()
                         with btn_p3:
                             if d:
                                 with st.popover("ℹ️", use_container_width=True): st.write(d)
@@ -1020,7 +841,7 @@ else:
                         agora = (datetime.utcnow() - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M")
                         c.execute("INSERT INTO agenda_itens (data_ref, titulo, descricao, status, criado_por, criado_em) VALUES (?, ?, ?, ?, ?, ?)",
                                  (v_dat.strftime("%Y-%m-%d"), v_tit, v_des, "Pendente", autor, agora))
-                        conn.commit(); st.success("Registrado!"); st.rerun()
+                        conn.commit(); avisar("agenda", "novo"); st.success("Registrado!"); st.rerun()
 
         conn.close()
 
@@ -1029,6 +850,31 @@ else:
     # ============================================================
     with st.sidebar:
         st.write(f"Logado como: **{st.session_state.perfil.upper()}**")
+        with st.expander("📊 Caches das artes"):
+            img = CACHE_IMAGENS.estatisticas()
+            lay = CACHE_LAYOUT.estatisticas()
+            st.caption(f"Imagens: {img['hits']} hits · {img['revalidados']} revalidadas · {img['misses']} misses ({img['taxa_acerto']:.0%})")
+            st.caption(f"Layout do título: {lay['hits']} hits · {lay['misses']} misses · {lay['entradas']} guardados ({lay['taxa_acerto']:.0%})")
+            pre = PRE_RENDERIZADOR.estatisticas()
+            st.caption(f"Pré-geradas: {pre['prontas']} prontas · {pre['na_fila']} na fila · {pre['falhas']} falhas")
+        if st.session_state.perfil in ADMINS:
+            with st.expander("⏱️ Desempenho por etapa"):
+                resumo = HISTOGRAMA.resumo()
+                if resumo:
+                    st.dataframe(
+                        [{"etapa": l["etapa"], "n": l["n"], "p50 ms": round(l["p50"], 1), "p95 ms": round(l["p95"], 1)} for l in resumo],
+                        hide_index=True, use_container_width=True,
+                    )
+                else:
+                    st.caption("Nenhuma medida ainda.")
+                pool = pool_db().estatisticas()
+                st.caption(f"SQLite ({pool_db().sincronismo}): {pool['abertas']} conexões abertas · {pool['reaproveitadas']} reaproveitadas")
+                for tarefa in agendador_manutencao().ultimas_execucoes():
+                    quando = (datetime.utcfromtimestamp(tarefa["quando"]) - timedelta(hours=3)).strftime("%d/%m %H:%M")
+                    st.caption(f"Manutenção {tarefa['tarefa']}: {quando} · {tarefa['resultado']}")
+                if st.button("Zerar medidas", use_container_width=True):
+                    HISTOGRAMA.limpar()
+                    st.rerun()
         if st.button("🚪 Sair do Sistema", use_container_width=True):
             st.session_state.autenticado = False
             st.rerun()
@@ -0,0 +1,771 @@
+"""Renderização das artes do Destaque Toledo (FEED e STORY), sem Streamlit.
+
+Usado pelo painel (app.py) e pela linha de comando (gerar_artes.py).
+"""
+import asyncio
+import hashlib
+import io
+import math
+import os
+import queue
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from PIL import Image, ImageDraw
+
+from cache_imagens import CacheImagens
+from feed_materias import FeedMaterias
+from extracao import escolher_imagem_util, extrair_dados_materia, extrair_links_materias
+from layout_texto import RegraTitulo, ajustar_titulo
+from medicao import etapa, medido
+
+# ============================================================
+# 1) CONFIG / CONSTANTES
+# ============================================================
+CAMINHO_FONTE = os.getenv("DT_FONTE_PATH", "Shoika Bold.ttf")
+TEMPLATE_FEED = os.getenv("DT_TEMPLATE_FEED", "template_feed.png")
+TEMPLATE_STORIE = os.getenv("DT_TEMPLATE_STORIE", "template_storie.png")
+
+TAMANHO_FEED = 1000
+TAMANHO_STORY = (1080, 1920)
+FOTO_STORY = (940, 541)
+
+HEADERS = {
+    "User-Agent": os.getenv(
+        "DT_USER_AGENT",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    )
+}
+
+REQUEST_TIMEOUT = int(os.getenv("DT_REQUEST_TIMEOUT", "12"))
+LOTE_WORKERS = int(os.getenv("DT_LOTE_WORKERS", "4"))
+
+# Requisições simultâneas: no total e para um mesmo host
+CONEXOES_MAX = int(os.getenv("DT_CONEXOES_MAX", "12"))
+CONEXOES_POR_HOST = int(os.getenv("DT_CONEXOES_POR_HOST", "6"))
+MAX_PIXELS_ORIGEM = int(os.getenv("DT_MAX_PIXELS", "60000000"))
+
+# Download da foto: limite de bytes e prazo total (não só por leitura)
+MAX_BYTES_IMAGEM = int(os.getenv("DT_MAX_IMG_MB", "15")) * 1024 * 1024
+PRAZO_IMAGEM = float(os.getenv("DT_PRAZO_IMAGEM", str(REQUEST_TIMEOUT)))
+
+# Cache das fotos em disco (0 MB desativa)
+CACHE_IMG_PASTA = os.getenv("DT_CACHE_IMG_PASTA", os.path.join(".cache_artes", "imagens"))
+CACHE_IMG_MAX_MB = int(os.getenv("DT_CACHE_IMG_MAX_MB", "200"))
+CACHE_IMG_FRESCOR = int(os.getenv("DT_CACHE_IMG_FRESCOR", "3600"))
+
+# Lista de matérias pelo feed do Blogger ("" usa só a raspagem da capa)
+FEED_URL = os.getenv("DT_FEED_URL", "https://www.destaquetoledo.com.br/feeds/posts/default")
+FEED_DB = os.getenv("DT_FEED_DB", os.path.join(".cache_artes", "materias.db"))
+
+# Validade dos metadados (título, imagem, og:*) de cada matéria em memória
+META_TTL = int(os.getenv("DT_META_TTL", "900"))
+
+# Artes prontas guardadas em memória: imagens renderizadas e arquivos já codificados
+ARTES_TTL = int(os.getenv("DT_ARTES_TTL", "21600"))
+ARTES_MAX = int(os.getenv("DT_ARTES_MAX", "64"))
+RENDER_MAX = int(os.getenv("DT_RENDER_MAX", "8"))
+PERFIL_PADRAO = os.getenv("DT_PERFIL", "jpeg")
+
+# ============================================================
+# 2) HTTP HELPERS (COM TIMEOUT + TRATAMENTO)
+# ============================================================
+def get_requests_session(headers: dict):
+    s = requests.Session()
+    s.headers.update(headers)
+    # Pool do tamanho do limite de concorrência: threads paralelas reaproveitam conexões
+    adaptador = HTTPAdapter(pool_connections=CONEXOES_MAX, pool_maxsize=CONEXOES_MAX)
+    s.mount("https://", adaptador)
+    s.mount("http://", adaptador)
+    return s
+
+SESSION = get_requests_session(HEADERS)
+
+@medido("http.pagina")
+def safe_get_text(url: str) -> str:
+    try:
+        r = SESSION.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+        r.raise_for_status()
+        if not r.encoding:
+            r.encoding = r.apparent_encoding or "utf-8"
+        return r.text
+    except requests.exceptions.Timeout:
+        raise RuntimeError("Tempo limite excedido ao acessar a página.")
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Falha HTTP ao acessar a página: {e}")
+
+CACHE_IMAGENS = CacheImagens(CACHE_IMG_PASTA, CACHE_IMG_MAX_MB * 1024 * 1024, CACHE_IMG_FRESCOR)
+
+def _baixar_imagem(url: str, etag: str = None, last_modified: str = None):
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        with SESSION.get(url, timeout=REQUEST_TIMEOUT, stream=True, allow_redirects=True, headers=headers) as r:
+            if r.status_code == 304:
+                return None, etag, last_modified
+            r.raise_for_status()
+            return _ler_imagem_limitada(r), r.headers.get("ETag"), r.headers.get("Last-Modified")
+    except requests.exceptions.Timeout:
+        raise RuntimeError("Tempo limite excedido ao baixar a imagem.")
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Falha HTTP ao baixar a imagem: {e}")
+
+TIPOS_BINARIOS = ("application/octet-stream", "binary/octet-stream")
+LIMITE_CABECALHO = 1024 * 1024
+
+def _ler_imagem_limitada(r: requests.Response) -> bytes:
+    """Lê o corpo em blocos, cortando cedo o que não é imagem ou passa dos limites.
+
+    A cada bloco, até o cabeçalho ser reconhecido, o Image.open tenta ler formato
+    e dimensões do que já chegou. Diferente do ImageFile.Parser, ele não aloca o
+    buffer de pixels, então uma foto enorme é recusada sem ocupar memória.
+    """
+    tipo = (r.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+    if tipo and not tipo.startswith("image/") and tipo not in TIPOS_BINARIOS:
+        raise ValueError(f"O link da imagem não devolveu uma imagem (Content-Type: {tipo}).")
+
+    tamanho = r.headers.get("Content-Length")
+    if tamanho and tamanho.isdigit() and int(tamanho) > MAX_BYTES_IMAGEM:
+        raise ValueError("A imagem da matéria é grande demais para baixar.")
+
+    prazo = time.monotonic() + PRAZO_IMAGEM
+    cabecalho_ok = False
+    partes, total = [], 0
+    for bloco in r.iter_content(chunk_size=64 * 1024):
+        partes.append(bloco)
+        total += len(bloco)
+        if total > MAX_BYTES_IMAGEM:
+            raise ValueError("A imagem da matéria é grande demais para baixar.")
+        if time.monotonic() > prazo:
+            raise RuntimeError("Tempo limite excedido ao baixar a imagem.")
+
+        if not cabecalho_ok:
+            try:
+                with Image.open(io.BytesIO(b"".join(partes))) as previa:
+                    larg, alt = previa.size
+            except Image.DecompressionBombError:
+                raise ValueError("A imagem da matéria é grande demais para processar.")
+            except Exception:
+                if total > LIMITE_CABECALHO:
+                    raise ValueError("O link encontrado na matéria não é uma imagem válida.")
+                continue
+            cabecalho_ok = True
+            if larg * alt > MAX_PIXELS_ORIGEM:
+                raise ValueError("A imagem da matéria é grande demais para processar.")
+
+    return b"".join(partes)
+
+@medido("http.imagem")
+def safe_get_bytes(url: str) -> bytes:
+    # Passa pelo cache em disco: repetir a mesma foto não baixa os bytes de novo
+    return CACHE_IMAGENS.buscar(url, _baixar_imagem)
+
+# ============================================================
+# 2.1) CACHE EM MEMÓRIA (VALIDADE + LIMITE)
+# ============================================================
+class CacheTTL:
+    """Cache em memória com validade e limite de entradas, seguro entre threads."""
+
+    def __init__(self, ttl: float, max_entradas: int):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            expira, valor = item
+            if expira < time.monotonic():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+# ============================================================
+# 3) SCRAPING + ARTE (ROBUSTO)
+# ============================================================
+def extrair_titulo(soup: BeautifulSoup) -> str:
+    h1 = soup.find("h1")
+    if h1:
+        t = h1.get_text(" ", strip=True)
+        if t:
+            return t
+    if soup.title and soup.title.get_text(strip=True):
+        return soup.title.get_text(strip=True)
+    return "Sem título"
+
+def encontrar_primeira_imagem_util(base_url: str, soup: BeautifulSoup) -> str:
+    # Versão para quem já tem a árvore montada; o painel usa extracao.extrair_dados_materia
+    corpo = soup.find(class_="post-body") or soup.find("article") or soup
+    return escolher_imagem_util(base_url, (img.attrs for img in corpo.find_all("img")))
+
+def garantir_fonte():
+    if not os.path.exists(CAMINHO_FONTE):
+        raise FileNotFoundError(
+            f"Fonte não encontrada: {CAMINHO_FONTE}. "
+            f"Ajuste DT_FONTE_PATH ou coloque o arquivo no mesmo diretório."
+        )
+
+@lru_cache(maxsize=8)
+def _carregar_template(template_path: str, mtime: float, size: tuple) -> Image.Image:
+    # O mtime entra na chave: se o PNG mudar no disco, a próxima chamada recarrega
+    tmp = Image.open(template_path).convert("RGBA").resize(size)
+    tmp.load()
+    return tmp
+
+def obter_template(template_path: str, size: tuple):
+    try:
+        mtime = os.path.getmtime(template_path)
+    except OSError:
+        return None
+    return _carregar_template(template_path, mtime, tuple(size))
+
+def aplicar_template_se_existir(base_img: Image.Image, template_path: str, size: tuple):
+    tmp = obter_template(template_path, size)
+    if tmp is not None:
+        base_img.alpha_composite(tmp)
+
+def aquecer_templates():
+    # Decodifica e redimensiona os templates uma vez, antes do primeiro clique
+    try:
+        obter_template(TEMPLATE_FEED, (TAMANHO_FEED, TAMANHO_FEED))
+        obter_template(TEMPLATE_STORIE, TAMANHO_STORY)
+    except Exception as e:
+        print(f"Erro ao pré-carregar templates: {e}")
+
+# ============================================================
+# 3.1) REGRAS DO TÍTULO (LAYOUT EM layout_texto.py)
+# ============================================================
+REGRA_FEED = RegraTitulo(
+    tam_max=85, tam_min=21, passo=1, largura_max=662, alt_max=165,
+    max_linhas=3, entrelinha=4, passo_desenho=4, x=488, y=811, centralizar=True, balancear=True,
+)
+REGRA_STORY = RegraTitulo(
+    tam_max=60, tam_min=22, passo=2, largura_max=912, alt_max=300,
+    max_linhas=4, entrelinha=10, passo_desenho=12, x=69, y=1079, folga_bloco=10,
+)
+
+# ============================================================
+# 3.2) MATÉRIA BAIXADA (UM DOWNLOAD PARA FEED E STORY)
+# ============================================================
+@dataclass(frozen=True)
+class MateriaBaixada:
+    """HTML já interpretado e imagem principal já decodificada de uma matéria."""
+    url: str
+    titulo_site: str
+    img_url: str
+    img_hash: str
+    imagem: Image.Image
+
+# resize() faz um reduce() inteiro até ficar a REDUCING_GAP vezes do tamanho final antes do
+# LANCZOS: cobre as fotos que a folga da decodificação deixa passar sem redução (ex.: 4000px PNG/WebP)
+REDUCING_GAP = 3.0
+
+def tamanho_minimo_origem(larg: int, alt: int) -> tuple:
+    """Menor tamanho da foto que ainda cobre o FEED e o STORY sem ampliar."""
+    escala = max(
+        TAMANHO_FEED / larg, TAMANHO_FEED / alt,
+        FOTO_STORY[0] / larg, FOTO_STORY[1] / alt,
+    )
+    return math.ceil(larg * escala), math.ceil(alt * escala)
+
+@medido("decodificacao")
+def decodificar_imagem(dados: bytes, folga: float = 2.0) -> Image.Image:
+    """Decodifica a foto já perto do tamanho usado nas artes.
+
+    JPEG usa o modo draft (escala na própria DCT); os demais formatos passam
+    por reduce() inteiro, deixando ``folga`` vezes o alvo para o LANCZOS final.
+    Fotos sem transparência ficam em RGB para economizar memória.
+    """
+    try:
+        img = Image.open(io.BytesIO(dados))
+    except Image.DecompressionBombError:
+        raise ValueError("A imagem da matéria é grande demais para processar.")
+    except Exception:
+        raise ValueError("O link encontrado na matéria não é uma imagem válida.")
+
+    larg, alt = img.size
+    if larg * alt > MAX_PIXELS_ORIGEM:
+        raise ValueError("A imagem da matéria é grande demais para processar.")
+
+    alvo = tamanho_minimo_origem(larg, alt)
+    if img.format == "JPEG":
+        img.draft("RGB", alvo)
+    img.load()
+
+    # Converte antes do reduce(): paleta (P), 1 bit e 16 bits (I;16) não aceitam reduce()
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        img = img.convert("RGBA") if img.mode != "RGBA" else img
+    else:
+        img = img.convert("RGB") if img.mode != "RGB" else img
+
+    fator = int(min(img.width / alvo[0], img.height / alvo[1]) / folga)
+    if fator >= 2:
+        img = img.reduce(fator)
+    return img
+
+_CACHE_MATERIAS = CacheTTL(ttl=600, max_entradas=16)
+
+def carregar_materia(url: str) -> MateriaBaixada:
+    # Compartilhado entre FEED, STORY e reruns do Streamlit para a mesma URL.
+    # A imagem guardada nunca é alterada: a renderização só cria cópias.
+    materia = _CACHE_MATERIAS.obter(url)
+    if materia is not None:
+        return materia
+
+    meta = obter_metadados(url)
+    if not meta.img_url:
+        raise ValueError("Não foi encontrada uma imagem válida na matéria.")
+
+    return montar_materia(url, meta, safe_get_bytes(meta.img_url))
+
+def materia_em_cache(url: str):
+    return _CACHE_MATERIAS.obter(url)
+
+def _identidade_materia(url: str):
+    # Matéria sem a imagem (URL, título do site, hash da foto): basta para montar a chave
+    # das artes prontas, que duram bem mais que a imagem decodificada em _CACHE_MATERIAS
+    return _CACHE_MATERIAS.obter(url) or _IDENTIDADES.obter(url)
+
+def montar_materia(url: str, meta: "MetadadosMateria", dados: bytes) -> MateriaBaixada:
+    materia = MateriaBaixada(
+        url=url,
+        titulo_site=meta.titulo,
+        img_url=meta.img_url,
+        img_hash=hashlib.sha256(dados).hexdigest(),
+        imagem=decodificar_imagem(dados),
+    )
+    _CACHE_MATERIAS.guardar(url, materia)
+    _IDENTIDADES.guardar(url, replace(materia, imagem=None))
+    return materia
+
+def processar_artes_integrado(url: str, tipo_solicitado: str, titulo_personalizado: str = None) -> Image.Image:
+    garantir_fonte()
+    return renderizar_arte(carregar_materia(url), tipo_solicitado, titulo_personalizado)
+
+def processar_feed_e_story(url: str, titulo_personalizado: str = None):
+    """Gera FEED e STORY com um único download e uma única decodificação."""
+    garantir_fonte()
+    materia = carregar_materia(url)
+    return (
+        renderizar_arte(materia, "FEED", titulo_personalizado),
+        renderizar_arte(materia, "STORY", titulo_personalizado),
+    )
+
+def titulo_final(materia: MateriaBaixada, titulo_personalizado: str = None) -> str:
+    # --- AJUSTE AQUI: Lógica de escolha do título ---
+    # Se você digitou algo na caixa, usamos o seu. Se estiver vazio, usa o do site.
+    return titulo_personalizado if titulo_personalizado and titulo_personalizado.strip() != "" else materia.titulo_site
+
+def renderizar_arte(materia: MateriaBaixada, tipo_solicitado: str, titulo_personalizado: str = None) -> Image.Image:
+    titulo = titulo_final(materia, titulo_personalizado)
+
+    img_original = materia.imagem
+    larg_o, alt_o = img_original.size
+    prop_o = larg_o / alt_o
+
+    if tipo_solicitado == "FEED":
+        with etapa("render.redimensionar"):
+            if prop_o > 1.0:
+                n_alt = TAMANHO_FEED
+                n_larg = int(n_alt * prop_o)
+                img_redim = img_original.resize((n_larg, n_alt), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+                margem = (n_larg - TAMANHO_FEED) // 2
+                fundo = img_redim.crop((margem, 0, margem + TAMANHO_FEED, TAMANHO_FEED))
+            else:
+                n_larg = TAMANHO_FEED
+                n_alt = int(n_larg / prop_o)
+                img_redim = img_original.resize((n_larg, n_alt), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+                margem = (n_alt - TAMANHO_FEED) // 2
+                fundo = img_redim.crop((0, margem, TAMANHO_FEED, margem + TAMANHO_FEED))
+
+        with etapa("render.template"):
+            fundo = fundo.convert("RGBA")
+            aplicar_template_se_existir(fundo, TEMPLATE_FEED, (TAMANHO_FEED, TAMANHO_FEED))
+        draw = ImageDraw.Draw(fundo)
+
+        # O ajuste usa o 'titulo' que pode ser o seu editado
+        with etapa("render.titulo"):
+            ajuste = ajustar_titulo(titulo, REGRA_FEED, CAMINHO_FONTE)
+        with etapa("render.texto"):
+            for lin, pos in zip(ajuste.linhas, ajuste.posicoes):
+                draw.text(pos, lin, fill="black", font=ajuste.fonte)
+            return fundo.convert("RGB")
+
+    # STORY
+    LARG_STORY, ALT_STORY = FOTO_STORY
+    ratio_a = LARG_STORY / ALT_STORY
+    if prop_o > ratio_a:
+        ns_alt = ALT_STORY
+        ns_larg = int(ns_alt * prop_o)
+    else:
+        ns_larg = LARG_STORY
+        ns_alt = int(ns_larg / prop_o)
+
+    with etapa("render.redimensionar"):
+        img_redim = img_original.resize((ns_larg, ns_alt), Image.LANCZOS, reducing_gap=REDUCING_GAP)
+        l_cut = (ns_larg - LARG_STORY) / 2
+        t_cut = (ns_alt - ALT_STORY) / 2
+        img_final = img_redim.crop((l_cut, t_cut, l_cut + LARG_STORY, t_cut + ALT_STORY))
+
+    with etapa("render.template"):
+        storie_canvas = Image.new("RGBA", TAMANHO_STORY, (0, 0, 0, 255))
+        storie_canvas.paste(img_final, (69, 504))
+        aplicar_template_se_existir(storie_canvas, TEMPLATE_STORIE, TAMANHO_STORY)
+
+    draw_s = ImageDraw.Draw(storie_canvas)
+    # O ajuste do story também usa o seu 'titulo' editado
+    with etapa("render.titulo"):
+        ajuste_s = ajustar_titulo(titulo, REGRA_STORY, CAMINHO_FONTE)
+    with etapa("render.texto"):
+        for lin, pos in zip(ajuste_s.linhas, ajuste_s.posicoes):
+            draw_s.text(pos, lin, fill="white", font=ajuste_s.fonte)
+        return storie_canvas.convert("RGB")
+
+# ============================================================
+# 3.2.1) ARTES PRONTAS (RENDER + ARQUIVO EM CACHE, CODIFICAÇÃO SOB DEMANDA)
+# ============================================================
+@dataclass(frozen=True)
+class PerfilCodificacao:
+    nome: str
+    rotulo: str
+    formato: str
+    extensao: str
+    mime: str
+    opcoes: tuple
+
+# Tempos e tamanhos medidos com bench/bench_codificacao.py
+PERFIS = {
+    p.nome: p
+    for p in (
+        PerfilCodificacao("previa", "Prévia rápida (JPEG 80)", "JPEG", "jpg", "image/jpeg", (("quality", 80),)),
+        PerfilCodificacao(
+            "jpeg", "JPEG alta qualidade", "JPEG", "jpg", "image/jpeg", (("quality", 95), ("optimize", True))
+        ),
+        PerfilCodificacao(
+            "progressivo", "JPEG progressivo", "JPEG", "jpg", "image/jpeg",
+            (("quality", 95), ("optimize", True), ("progressive", True)),
+        ),
+        PerfilCodificacao("webp", "WebP", "WEBP", "webp", "image/webp", (("quality", 85), ("method", 2))),
+    )
+}
+
+_CACHE_RENDER = CacheTTL(ttl=ARTES_TTL, max_entradas=RENDER_MAX)
+_CACHE_ARTES = CacheTTL(ttl=ARTES_TTL, max_entradas=ARTES_MAX)
+_IDENTIDADES = CacheTTL(ttl=ARTES_TTL, max_entradas=ARTES_MAX)
+
+def _mtime(caminho: str):
+    try:
+        return os.path.getmtime(caminho)
+    except OSError:
+        return None
+
+def chave_arte(materia: MateriaBaixada, tipo: str, titulo: str) -> tuple:
+    # Tudo que muda o resultado: foto, texto final, formato, template e fonte
+    template = TEMPLATE_FEED if tipo == "FEED" else TEMPLATE_STORIE
+    return (
+        materia.url, materia.img_hash, titulo, tipo,
+        template, _mtime(template), CAMINHO_FONTE, _mtime(CAMINHO_FONTE),
+    )
+
+def codificar(img: Image.Image, perfil: PerfilCodificacao) -> bytes:
+    with etapa("codificacao." + perfil.nome):
+        buf = io.BytesIO()
+        img.save(buf, perfil.formato, **dict(perfil.opcoes))
+        return buf.getvalue()
+
+def gerar_arte(url: str, tipo_solicitado: str, titulo_personalizado: str = None, perfil: str = None) -> bytes:
+    """Arquivo da arte no perfil pedido; se nada mudou, é só uma consulta ao cache.
+
+    A imagem renderizada também fica em cache, então pedir outro perfil da
+    mesma arte (prévia e depois o download) só paga a codificação.
+    """
+    # A chave sai da identidade guardada (URL, título do site, hash da foto), que dura tanto
+    # quanto as artes: com a arte ou o render em cache, nada de baixar a página ou decodificar a foto
+    identidade = _identidade_materia(url)
+    if identidade is not None:
+        dados = _arte_sem_renderizar(identidade, tipo_solicitado, titulo_personalizado, PERFIS[perfil or PERFIL_PADRAO])
+        if dados is not None:
+            return dados
+    garantir_fonte()
+    return arte_da_materia(carregar_materia(url), tipo_solicitado, titulo_personalizado, perfil)
+
+def arte_em_cache(url: str, tipo_solicitado: str, titulo_personalizado: str = None, perfil: str = None):
+    """Arquivo da arte se já estiver pronto (ex.: pré-gerado); None sem baixar nem renderizar."""
+    materia = _identidade_materia(url)
+    if materia is None:
+        return None
+    perfil = PERFIS[perfil or PERFIL_PADRAO]
+    chave = chave_arte(materia, tipo_solicitado, titulo_final(materia, titulo_personalizado))
+    return _CACHE_ARTES.obter(chave + (perfil.nome,))
+
+def arte_da_materia(
+    materia: MateriaBaixada, tipo_solicitado: str, titulo_personalizado: str = None, perfil: str = None,
+    guardar_render: bool = True,
+) -> bytes:
+    # guardar_render=False (pré-geração): não tira do _CACHE_RENDER o render de quem está usando o painel
+    perfil = PERFIS[perfil or PERFIL_PADRAO]
+    dados = _arte_sem_renderizar(materia, tipo_solicitado, titulo_personalizado, perfil)
+    if dados is None:
+        chave = chave_arte(materia, tipo_solicitado, titulo_final(materia, titulo_personalizado))
+        img = renderizar_arte(materia, tipo_solicitado, titulo_personalizado)
+        if guardar_render:
+            _CACHE_RENDER.guardar(chave, img)
+        dados = codificar(img, perfil)
+        _CACHE_ARTES.guardar(chave + (perfil.nome,), dados)
+    return dados
+
+def _arte_sem_renderizar(materia: MateriaBaixada, tipo_solicitado: str, titulo_personalizado: str, perfil: PerfilCodificacao):
+    # Arquivo pronto ou, com o render em cache, só a codificação; None se precisar renderizar.
+    # Só usa url, título do site e hash da foto: serve também para a identidade sem imagem
+    chave = chave_arte(materia, tipo_solicitado, titulo_final(materia, titulo_personalizado))
+    dados = _CACHE_ARTES.obter(chave + (perfil.nome,))
+    if dados is None:
+        img = _CACHE_RENDER.obter(chave)
+        if img is not None:
+            dados = codificar(img, perfil)
+            _CACHE_ARTES.guardar(chave + (perfil.nome,), dados)
+    return dados
+
+# ============================================================
+# 3.3) METADADOS DA MATÉRIA (CACHE POR URL)
+# ============================================================
+@dataclass(frozen=True)
+class MetadadosMateria:
+    url: str
+    titulo: str          # <h1> ou <title>, usado na arte
+    titulo_limpo: str    # <title> sem o sufixo do site, sugerido para edição
+    img_url: str
+    og: dict
+
+_CACHE_METADADOS = CacheTTL(ttl=META_TTL, max_entradas=64)
+
+def obter_metadados(url: str) -> MetadadosMateria:
+    # Um download + parse por URL dentro da validade: o autorefresh não raspa a página de novo
+    meta = _CACHE_METADADOS.obter(url)
+    if meta is not None:
+        return meta
+
+    html = safe_get_text(url)
+    with etapa("extracao.materia"):
+        dados = extrair_dados_materia(html, url)
+    meta = MetadadosMateria(
+        url=url,
+        titulo=dados.titulo,
+        titulo_limpo=(dados.title or "").replace(" - Destaque Toledo", "").strip(),
+        img_url=dados.img_url,
+        og=dados.og,
+    )
+    _CACHE_METADADOS.guardar(url, meta)
+    return meta
+
+def obter_titulo_limpo(url: str) -> str:
+    try:
+        return obter_metadados(url).titulo_limpo
+    except Exception:
+        return ""
+
+# ============================================================
+# 3.4) BUSCA CONCORRENTE DO LOTE (LIMITE GERAL E POR HOST)
+# ============================================================
+class LimitesConexao:
+    """Quantas requisições do lote correm ao mesmo tempo.
+
+    Não é um cliente HTTP assíncrono: cada requisição continua bloqueante no
+    requests (limites de bytes/prazo, cache em disco e pool da SESSION), numa
+    thread do pool próprio. O laço asyncio do gerar_lote só coordena a
+    concorrência, com um teto geral e outro por host.
+    """
+
+    def __init__(self, total: int = None, por_host: int = None):
+        total = total or CONEXOES_MAX
+        self.total = asyncio.Semaphore(total)
+        self.por_host = por_host or CONEXOES_POR_HOST
+        self._hosts = {}
+        self._pool = ThreadPoolExecutor(max_workers=total, thread_name_prefix="rede")
+
+    def _semaforo_host(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.por_host)
+        return sem
+
+    async def chamar(self, url: str, fn, *args):
+        async with self.total, self._semaforo_host(url):
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    def fechar(self):
+        self._pool.shutdown(wait=False)
+
+async def carregar_materia_async(url: str, limites: LimitesConexao) -> MateriaBaixada:
+    """Mesmo resultado de carregar_materia; várias matérias baixam em paralelo."""
+    materia = _CACHE_MATERIAS.obter(url)
+    if materia is not None:
+        return materia
+    meta = await limites.chamar(url, obter_metadados, url)
+    if not meta.img_url:
+        raise ValueError("Não foi encontrada uma imagem válida na matéria.")
+    dados = await limites.chamar(meta.img_url, safe_get_bytes, meta.img_url)
+    return await asyncio.to_thread(montar_materia, url, meta, dados)
+
+# ============================================================
+# 4) BUSCAR ÚLTIMAS (URL ABSOLUTA)
+# ============================================================
+SITE_BASE = "https://www.destaquetoledo.com.br/"
+
+FEED_MATERIAS = FeedMaterias(FEED_DB, FEED_URL)
+
+def _baixar_feed(url: str, etag: str = None, last_modified: str = None):
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        r = SESSION.get(url, timeout=REQUEST_TIMEOUT, allow_redirects=True, headers=headers)
+        if r.status_code == 304:
+            return None, etag, last_modified
+        r.raise_for_status()
+        return r.content, r.headers.get("ETag"), r.headers.get("Last-Modified")
+    except requests.exceptions.Timeout:
+        raise RuntimeError("Tempo limite excedido ao acessar o feed.")
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Falha HTTP ao acessar o feed: {e}")
+
+def _ultimas_da_capa(limite: int) -> list:
+    html = safe_get_text(SITE_BASE)
+    with etapa("extracao.capa"):
+        return extrair_links_materias(html, SITE_BASE, limite)
+
+@medido("ultimas")
+def buscar_ultimas_materias(limite: int = 12) -> list:
+    """Últimas matérias ({"t": título, "u": url}): feed incremental, capa como reserva."""
+    if not FEED_URL:
+        return _ultimas_da_capa(limite)
+    try:
+        with etapa("ultimas.feed"):
+            FEED_MATERIAS.atualizar(_baixar_feed)
+        itens = FEED_MATERIAS.ultimas(limite)
+        if itens:
+            return itens
+    except Exception as e:
+        print(f"Feed indisponível, usando a capa: {e}")
+    try:
+        return _ultimas_da_capa(limite)
+    except Exception:
+        # Sem rede: o que o feed já trouxe antes ainda serve
+        itens = FEED_MATERIAS.ultimas(limite)
+        if itens:
+            return itens
+        raise
+
+# ============================================================
+# 4.1) GERAÇÃO EM LOTE (FEED + STORY EM PARALELO, SAÍDA EM ZIP)
+# ============================================================
+def nome_arquivo_materia(url: str) -> str:
+    ultimo = url.rstrip("/").rsplit("/", 1)[-1]
+    ultimo = re.sub(r"\.html?$", "", ultimo)
+    return re.sub(r"[^a-zA-Z0-9_-]+", "-", ultimo).strip("-")[:60] or "materia"
+
+def _renderizar_item_lote(materia: MateriaBaixada, tipos, perfil: str) -> dict:
+    # Renderização e codificação rodam na thread: o Pillow libera o GIL nessas etapas
+    return {tipo: arte_da_materia(materia, tipo, perfil=perfil) for tipo in tipos}
+
+async def _produzir_lote(urls, tipos, workers: int, perfil: str, saida: queue.Queue):
+    # Downloads de todas as matérias ao mesmo tempo (limitados por host);
+    # cada uma segue para o pool de renderização assim que chega
+    loop = asyncio.get_running_loop()
+    limites = LimitesConexao()
+
+    async def item(i: int, u: str):
+        try:
+            materia = await carregar_materia_async(u, limites)
+            arquivos = await loop.run_in_executor(render, _renderizar_item_lote, materia, tipos, perfil)
+            saida.put((i, u, arquivos, None))
+        except Exception as e:
+            saida.put((i, u, None, str(e)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render") as render:
+        try:
+            await asyncio.gather(*(item(i, u) for i, u in enumerate(urls, 1)))
+        finally:
+            limites.fechar()
+
+def gerar_lote(urls, tipos=("FEED", "STORY"), max_workers: int = None, perfil: str = None):
+    """Renderiza várias matérias em paralelo.
+
+    Gera tuplas (indice, url, arquivos, erro) na ordem em que cada matéria
+    termina; ``arquivos`` mapeia o formato para os bytes do arquivo.
+    ``max_workers`` limita as renderizações simultâneas; os downloads seguem
+    CONEXOES_MAX / CONEXOES_POR_HOST.
+    """
+    garantir_fonte()
+    urls = list(dict.fromkeys(u for u in urls if u))
+    workers = max(1, min(max_workers or LOTE_WORKERS, len(urls) or 1))
+    saida = queue.Queue()
+    fim = object()
+
+    def rodar():
+        try:
+            asyncio.run(_produzir_lote(urls, tipos, workers, perfil, saida))
+        finally:
+            saida.put(fim)
+
+    threading.Thread(target=rodar, name="lote", daemon=True).start()
+    while True:
+        resultado = saida.get()
+        if resultado is fim:
+            return
+        yield resultado
+
+def nome_arquivo_arte(indice: int, url: str, tipo: str, perfil: str = None) -> str:
+    extensao = PERFIS[perfil or PERFIL_PADRAO].extensao
+    return f"{indice:02d}_{nome_arquivo_materia(url)}_{tipo.lower()}.{extensao}"
+
+def gerar_lote_zip(urls, max_workers: int = None, perfil: str = None):
+    """Gera FEED e STORY de várias matérias em paralelo e devolve (zip_bytes, erros)."""
+    erros = []
+    zbuf = io.BytesIO()
+
+    # JPEG/WebP já são comprimidos: ZIP_STORED evita gastar CPU à toa
+    with zipfile.ZipFile(zbuf, "w", zipfile.ZIP_STORED) as zf:
+        for i, u, arquivos, erro in gerar_lote(urls, max_workers=max_workers, perfil=perfil):
+            if erro:
+                erros.append((u, erro))
+                continue
+            for tipo, dados in arquivos.items():
+                zf.writestr(nome_arquivo_arte(i, u, tipo, perfil), dados)
+
+        if erros:
+            zf.writestr("erros.txt", "\n".join(f"{u}\t{msg}" for u, msg in erros))
+
+    return zbuf.getvalue(), erros
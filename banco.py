@@ -0,0 +1,103 @@
+"""Conexões SQLite reaproveitadas entre reruns, com durabilidade configurável.
+
+Cada thread recebe sempre a mesma conexão (PRAGMAs aplicados uma vez e cache
+de comandos preparados preservado). O Streamlit roda cada rerun numa thread
+nova; quando uma thread termina, a conexão dela volta para o pool e é
+entregue à próxima, em vez de abrir outra.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from medicao import ConexaoMedida
+
+SINCRONISMOS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+class ConexaoReutilizavel(ConexaoMedida):
+    """close() devolve a conexão ao uso, desfazendo o que ficou sem commit."""
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def fechar(self):
+        sqlite3.Connection.close(self)
+
+class PoolConexoes:
+    """Uma conexão por thread viva, reaproveitada quando a thread acaba.
+
+    ``sincronismo`` é o PRAGMA synchronous: em WAL, FULL faz fsync a cada
+    commit; NORMAL só nos checkpoints (um commit pode se perder numa queda
+    de energia, mas o banco nunca corrompe).
+    """
+
+    def __init__(self, caminho: str, sincronismo: str = "FULL", busy_timeout_ms: int = 5000, cache_comandos: int = 256):
+        sincronismo = sincronismo.upper()
+        if sincronismo not in SINCRONISMOS:
+            raise ValueError(f"synchronous inválido: {sincronismo} (use {', '.join(SINCRONISMOS)})")
+        self.caminho = caminho
+        self.sincronismo = sincronismo
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cache_comandos = cache_comandos
+        self._por_thread = {}       # ident -> (thread, conexão)
+        self._livres = []
+        self._lock = threading.Lock()
+        self._contadores = {"abertas": 0, "reaproveitadas": 0}
+
+    def _abrir(self) -> ConexaoReutilizavel:
+        conn = sqlite3.connect(
+            self.caminho,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cache_comandos,
+            factory=ConexaoReutilizavel,
+        )
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(f"PRAGMA synchronous={self.sincronismo};")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)};")
+        self._contadores["abertas"] += 1
+        return conn
+
+    def conexao(self) -> ConexaoReutilizavel:
+        atual = threading.current_thread()
+        with self._lock:
+            item = self._por_thread.get(atual.ident)
+            if item is not None and item[0] is atual:
+                return item[1]
+            # Recolhe as conexões de threads que já terminaram (reruns anteriores)
+            for ident, (thread, conn) in list(self._por_thread.items()):
+                if not thread.is_alive() or ident == atual.ident:
+                    del self._por_thread[ident]
+                    if conn.in_transaction:
+                        conn.rollback()
+                    self._livres.append(conn)
+            if self._livres:
+                conn = self._livres.pop()
+                self._contadores["reaproveitadas"] += 1
+            else:
+                conn = self._abrir()
+            self._por_thread[atual.ident] = (atual, conn)
+            return conn
+
+    @contextmanager
+    def transacao(self):
+        """Commit ao sair do bloco; rollback se algo der errado (inclusive st.rerun/st.stop)."""
+        conn = self.conexao()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return dict(self._contadores, em_uso=len(self._por_thread), livres=len(self._livres))
+
+    def fechar_todas(self):
+        with self._lock:
+            conexoes = [conn for _, conn in self._por_thread.values()] + self._livres
+            self._por_thread.clear()
+            self._livres.clear()
+        for conn in conexoes:
+            conn.fechar()
@@ -0,0 +1,56 @@
+"""Mede tempo de codificação e tamanho do arquivo de cada perfil (artes.PERFIS).
+
+Renderiza um FEED e um STORY a partir de uma foto sintética (sem rede) e
+codifica cada um com todos os perfis.
+
+    python bench/bench_codificacao.py [-n REPETICOES]
+"""
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from artes import PERFIS, MateriaBaixada, codificar, renderizar_arte  # noqa: E402
+
+TITULO = "Prefeitura anuncia obras de revitalização no centro de Toledo a partir da próxima semana"
+
+def foto_sintetica(larg: int = 1600, alt: int = 1067) -> Image.Image:
+    """Foto com gradiente, formas e ruído: comprime parecido com uma foto real."""
+    img = Image.linear_gradient("L").resize((larg, alt)).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for i in range(40):
+        x, y = (i * 97) % larg, (i * 53) % alt
+        draw.ellipse((x, y, x + 180, y + 120), fill=((i * 37) % 255, (i * 91) % 255, (i * 23) % 255))
+    ruido = Image.effect_noise((larg, alt), 40).convert("RGB")
+    return Image.blend(img.filter(ImageFilter.GaussianBlur(2)), ruido, 0.15)
+
+def cronometrar(fn, repeticoes: int):
+    melhor, resultado = float("inf"), None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        resultado = fn()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor * 1000, resultado
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--repeticoes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    materia = MateriaBaixada(url="bench", titulo_site=TITULO, img_url="", img_hash="", imagem=foto_sintetica())
+    print(f"{'formato':<7} {'perfil':<12} {'ms':>8} {'KB':>8}")
+    for tipo in ("FEED", "STORY"):
+        arte = renderizar_arte(materia, tipo)
+        for perfil in PERFIS.values():
+            ms, dados = cronometrar(lambda: codificar(arte, perfil), args.repeticoes)
+            print(f"{tipo:<7} {perfil.nome:<12} {ms:>8.1f} {len(dados) / 1024:>8.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Plano e tempo das consultas que o painel roda a cada rerun.
+
+Cria um banco temporário pelas migrações, enche com N pautas e itens de
+agenda e roda cada consulta quente com EXPLAIN QUERY PLAN. Sai com erro se
+alguma varrer a tabela inteira (``SCAN tabela`` sem índice) — serve de
+verificação antes de mexer nas consultas do app.py ou nas migrações.
+
+    python bench/bench_consultas.py [-n LINHAS]
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from migracoes import VERSAO_ATUAL, migrar, versao_banco  # noqa: E402
+
+HOJE = date(2025, 6, 15)
+AMANHA = HOJE + timedelta(days=1)
+
+# Cópia das consultas do app.py (mesmo texto: índices parciais e de expressão dependem dele)
+CONSULTAS = {
+    "monitor_pautas": (
+        "SELECT id, titulo, prioridade, data_envio, status FROM pautas_trabalho "
+        "WHERE status != 'Concluído' ORDER BY id DESC LIMIT 10",
+        (),
+    ),
+    "fila_brayan": (
+        "SELECT id, titulo, link_ref, prioridade, data_envio, observacao, status FROM pautas_trabalho WHERE status != 'Concluído' "
+        "ORDER BY CASE WHEN prioridade = 'URGENTE' THEN 1 WHEN prioridade = 'Normal' THEN 2 ELSE 3 END ASC, id DESC",
+        (),
+    ),
+    "agenda_juan": (
+        "SELECT id, data_ref, titulo, descricao, status, criado_por FROM agenda_itens "
+        "WHERE (data_ref BETWEEN ? AND ?) OR (status = 'Pendente' AND data_ref < ?) "
+        "ORDER BY status DESC, data_ref ASC",
+        (HOJE.isoformat(), (HOJE + timedelta(days=7)).isoformat(), HOJE.isoformat()),
+    ),
+    "kpis_brayan": (
+        "SELECT nome, valor FROM contadores WHERE nome IN (?,?)",
+        ("pautas_abertas", "agenda_pendente:brayan"),
+    ),
+    "agenda_brayan": (
+        "SELECT id, data_ref, titulo, descricao FROM agenda_itens "
+        "WHERE status = 'Pendente' AND criado_por = 'brayan' AND (data_ref < ? OR data_ref <= ?) "
+        "ORDER BY data_ref ASC",
+        (HOJE.isoformat(), AMANHA.isoformat()),
+    ),
+    "agenda_pessoal": (
+        "SELECT id, data_ref, titulo, descricao FROM agenda_itens "
+        "WHERE status = 'Pendente' AND criado_por = 'brayan_pessoal' AND (data_ref < ? OR data_ref <= ?) "
+        "ORDER BY data_ref ASC",
+        (HOJE.isoformat(), AMANHA.isoformat()),
+    ),
+    "limpeza_agenda": (
+        "DELETE FROM agenda_itens WHERE status = 'Concluído' AND data_ref < ?",
+        ((HOJE - timedelta(days=30)).isoformat(),),
+    ),
+}
+
+# "SCAN pautas_trabalho" = tabela inteira; "SCAN ... USING INDEX" percorre só o índice (parcial)
+_RE_VARREDURA = re.compile(r"^SCAN (\w+)$")
+
+def popular(conn: sqlite3.Connection, n: int):
+    rnd = random.Random(42)
+    with conn:
+        conn.executemany(
+            "INSERT INTO pautas_trabalho (titulo, link_ref, status, data_envio, prioridade, observacao) VALUES (?,?,?,?,?,?)",
+            [
+                (f"Pauta {i}", "", "Concluído" if rnd.random() < 0.9 else "Pendente", "01/01 10:00",
+                 rnd.choice(["URGENTE", "Normal", "Baixa"]), "")
+                for i in range(n)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO agenda_itens (data_ref, titulo, descricao, status, criado_por, criado_em) VALUES (?,?,?,?,?,?)",
+            [
+                ((HOJE + timedelta(days=rnd.randint(-365, 30))).isoformat(), f"Item {i}", "",
+                 "Concluído" if rnd.random() < 0.85 else "Pendente",
+                 rnd.choice(["juan", "brayan", "brayan_pessoal"]), "")
+                for i in range(n)
+            ],
+        )
+    conn.execute("ANALYZE")
+
+def plano(conn: sqlite3.Connection, sql: str, params) -> list:
+    return [linha[3] for linha in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--linhas", type=int, default=20000, help="pautas e itens de agenda no banco de teste")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        conn = sqlite3.connect(os.path.join(pasta, "consultas.db"))
+        migrar(conn)
+        assert versao_banco(conn) == VERSAO_ATUAL
+        popular(conn, args.linhas)
+
+        varreduras = []
+        print(f"{'consulta':<20} {'ms':>8}  plano")
+        for nome, (sql, params) in CONSULTAS.items():
+            detalhes = plano(conn, sql, params)
+            t0 = time.perf_counter()
+            if sql.startswith("DELETE"):
+                conn.execute("SAVEPOINT medir")
+                conn.execute(sql, params)
+                conn.execute("ROLLBACK TO medir")
+                conn.execute("RELEASE medir")
+            else:
+                conn.execute(sql, params).fetchall()
+            ms = (time.perf_counter() - t0) * 1000
+            print(f"{nome:<20} {ms:8.2f}  {' | '.join(detalhes)}")
+            varreduras += [f"{nome}: {d}" for d in detalhes if _RE_VARREDURA.match(d)]
+        conn.close()
+
+    if varreduras:
+        print("\nVarredura completa de tabela:")
+        for v in varreduras:
+            print(f"  {v}")
+        return 1
+    print(f"\nOK: nenhuma consulta quente varre tabela inteira (schema v{VERSAO_ATUAL}).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Compara a extração direcionada (extracao.py) com a árvore completa do BeautifulSoup.
+
+Usa as páginas salvas em bench/paginas/*.html (matérias) e bench/paginas/capa*.html
+(página inicial). Sem páginas salvas, gera páginas sintéticas no formato do Blogger.
+
+    python bench/bench_extracao.py
+    python bench/bench_extracao.py --salvar URL_DA_MATERIA [URL ...]
+    python bench/bench_extracao.py --salvar-capa
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from extracao import escolher_imagem_util, extrair_dados_materia, extrair_links_materias  # noqa: E402
+
+PASTA_PAGINAS = os.path.join(RAIZ, "bench", "paginas")
+BASE = "https://www.destaquetoledo.com.br/"
+
+def pagina_blogger_sintetica(n_widgets: int = 60, n_links: int = 80) -> str:
+    """Página parecida com uma matéria do Blogger: head cheio, sidebar e rodapé grandes."""
+    head = "".join(f'<meta name="m{i}" content="{"x" * 40}">' for i in range(40))
+    links = "".join(
+        f'<li><a href="/2024/05/materia-numero-{i}.html">Matéria de exemplo número {i} sobre a cidade de Toledo</a></li>'
+        for i in range(n_links)
+    )
+    widgets = "".join(
+        f'<div class="widget"><h2>Widget {i}</h2><img src="/icon-{i}.png"><p>{"texto " * 50}</p></div>'
+        for i in range(n_widgets)
+    )
+    return (
+        "<html><head><title>Prefeitura anuncia obras no centro - Destaque Toledo</title>"
+        '<meta property="og:title" content="Prefeitura anuncia obras no centro">'
+        '<meta property="og:image" content="https://blogger.googleusercontent.com/img/a/foto.jpg">'
+        f"{head}<style>{'.c{color:red}' * 500}</style></head><body>"
+        f'<div class="header"><img src="/logo.png"><ul>{links}</ul></div>'
+        '<div class="post"><h1 class="post-title"> Prefeitura anuncia <b>obras</b> no centro </h1>'
+        '<div class="post-body entry-content"><div class="separator">'
+        '<a href="https://blogger.googleusercontent.com/img/a/foto.jpg">'
+        '<img data-src="https://blogger.googleusercontent.com/img/a/foto.jpg" src="https://blogger.googleusercontent.com/img/a/foto.jpg"></a></div>'
+        f"<p>{'Texto da matéria. ' * 400}</p></div></div>"
+        f'<div class="sidebar">{widgets}</div><div class="comments">{"<p>comentário</p>" * 300}</div>'
+        f"<script>{'var a = 1;' * 2000}</script></body></html>"
+    )
+
+def _materia_soup(html: str, url: str):
+    soup = BeautifulSoup(html, "html.parser")
+    h1 = soup.find("h1")
+    titulo = h1.get_text(" ", strip=True) if h1 else ""
+    if not titulo:
+        titulo = soup.title.get_text(strip=True) if soup.title and soup.title.get_text(strip=True) else "Sem título"
+    corpo = soup.find(class_="post-body") or soup.find("article") or soup
+    img = escolher_imagem_util(url, (i.attrs for i in corpo.find_all("img")))
+    return titulo, img
+
+def _materia_direcionada(html: str, url: str):
+    dados = extrair_dados_materia(html, url)
+    return dados.titulo, dados.img_url
+
+def _links_soup(html: str, base: str, limite: int = 12):
+    soup = BeautifulSoup(html, "html.parser")
+    out, vistos = [], set()
+    for a in soup.find_all("a", href=True):
+        href = (a.get("href") or "").strip()
+        t = a.get_text(strip=True)
+        if ".html" in href and "/20" in href and t and len(t) > 25:
+            u = urljoin(base, href)
+            if u not in vistos:
+                vistos.add(u)
+                out.append({"t": t, "u": u})
+    return out[:limite]
+
+def cronometrar(fn, *args, repeticoes: int = 20) -> float:
+    """Menor tempo (ms) entre as repetições."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        fn(*args)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor * 1000
+
+def salvar(urls, nome_fixo: str = None):
+    import requests
+
+    os.makedirs(PASTA_PAGINAS, exist_ok=True)
+    for i, url in enumerate(urls):
+        r = requests.get(url, timeout=15, headers={"User-Agent": "Mozilla/5.0"})
+        r.raise_for_status()
+        nome = nome_fixo or url.rstrip("/").rsplit("/", 1)[-1] or f"pagina{i}.html"
+        with open(os.path.join(PASTA_PAGINAS, nome), "w", encoding="utf-8") as f:
+            f.write(f"<!-- {url} -->\n" + r.text)
+        print("salvo:", nome)
+
+def carregar_paginas():
+    materias, capas = [], []
+    for caminho in sorted(glob.glob(os.path.join(PASTA_PAGINAS, "*.html"))):
+        with open(caminho, encoding="utf-8") as f:
+            html = f.read()
+        nome = os.path.basename(caminho)
+        (capas if nome.startswith("capa") else materias).append((nome, html))
+    if not materias:
+        materias = [("sintetica.html", pagina_blogger_sintetica())]
+    if not capas:
+        capas = [("capa_sintetica.html", pagina_blogger_sintetica(n_links=300))]
+    return materias, capas
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salvar", nargs="+", metavar="URL", help="baixa matérias para bench/paginas")
+    parser.add_argument("--salvar-capa", action="store_true", help="baixa a página inicial para bench/paginas")
+    parser.add_argument("-n", "--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.salvar or args.salvar_capa:
+        if args.salvar:
+            salvar(args.salvar)
+        if args.salvar_capa:
+            salvar([BASE], nome_fixo="capa.html")
+        return 0
+
+    materias, capas = carregar_paginas()
+    divergencias = 0
+    print(f"{'página':<40} {'KB':>6} {'soup ms':>9} {'direc. ms':>10} {'ganho':>7}")
+    casos = [(n, h, _materia_soup, _materia_direcionada) for n, h in materias]
+    casos += [(n, h, _links_soup, extrair_links_materias) for n, h in capas]
+    for nome, html, ref, novo in casos:
+        url = BASE + nome
+        if ref(html, url) != novo(html, url):
+            divergencias += 1
+            print(f"  DIVERGÊNCIA em {nome}: {ref(html, url)!r} != {novo(html, url)!r}")
+        t_ref = cronometrar(ref, html, url, repeticoes=args.repeticoes)
+        t_novo = cronometrar(novo, html, url, repeticoes=args.repeticoes)
+        print(f"{nome[:40]:<40} {len(html) / 1024:>6.0f} {t_ref:>9.2f} {t_novo:>10.2f} {t_ref / t_novo:>6.1f}x")
+
+    return 1 if divergencias else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
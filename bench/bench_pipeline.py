@@ -0,0 +1,249 @@
+"""Benchmark offline do pipeline das artes: página → foto → FEED/STORY → arquivo.
+
+Um servidor HTTP local faz o papel do site: serve as matérias salvas em
+bench/paginas (ou a página sintética do bench_extracao) apontando para fotos
+sintéticas de vários tamanhos e formatos. Mede cada etapa, o pico de memória
+de cada caso e a vazão por núcleo, e compara com bench/linha_base.json.
+
+    python bench/bench_pipeline.py [-n REPETICOES] [-p PERFIL]
+    python bench/bench_pipeline.py --gravar-base
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(RAIZ)
+
+# Sem cache em disco: toda repetição baixa a foto de novo
+os.environ["DT_CACHE_IMG_MAX_MB"] = "0"
+
+from PIL import Image  # noqa: E402
+
+import artes  # noqa: E402
+from bench_codificacao import foto_sintetica  # noqa: E402
+from bench_extracao import carregar_paginas  # noqa: E402
+from extracao import extrair_dados_materia  # noqa: E402
+from layout_texto import CACHE_LAYOUT  # noqa: E402
+
+ARQUIVO_BASE = os.path.join(RAIZ, "bench", "linha_base.json")
+TOLERANCIA_PADRAO = 0.5
+FOLGA_MS = 2.0          # etapas de poucos ms oscilam mais que a tolerância relativa
+
+# nome: (largura, altura, formato, extensão, modo)
+CASOS = {
+    "4000px": (4000, 2667, "JPEG", "jpg", "RGB"),
+    "larga": (3200, 900, "JPEG", "jpg", "RGB"),
+    "alta": (900, 2400, "JPEG", "jpg", "RGB"),
+    "png_alfa": (1600, 1067, "PNG", "png", "RGBA"),
+    "webp": (1600, 1067, "WEBP", "webp", "RGB"),
+}
+TIPOS_MIME = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp", "html": "text/html; charset=utf-8"}
+
+def gerar_foto(larg: int, alt: int, formato: str, modo: str) -> bytes:
+    img = foto_sintetica(larg, alt)
+    if modo == "RGBA":
+        img.putalpha(Image.linear_gradient("L").resize((larg, alt)))
+    buf = io.BytesIO()
+    opcoes = {"JPEG": {"quality": 90}, "WEBP": {"quality": 85}}.get(formato, {})
+    img.save(buf, formato, **opcoes)
+    return buf.getvalue()
+
+def pagina_com_foto(html: str, url_foto: str) -> str:
+    # Troca a foto principal da matéria salva pela foto sintética servida localmente
+    original = extrair_dados_materia(html, "https://www.destaquetoledo.com.br/").img_url
+    if original and original in html:
+        return html.replace(original, url_foto)
+    return html.replace("<body>", f'<body><div class="post-body"><img src="{url_foto}"></div>', 1)
+
+class SiteLocal:
+    """Servidor HTTP em thread servindo um dicionário caminho → bytes."""
+
+    def __init__(self):
+        self.arquivos = {}
+        arquivos = self.arquivos
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                caminho = self.path.split("?", 1)[0]
+                if caminho not in arquivos:
+                    self.send_error(404)
+                    return
+                corpo = arquivos[caminho]
+                self.send_response(200)
+                self.send_header("Content-Type", TIPOS_MIME[caminho.rsplit(".", 1)[-1]])
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        self.base = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def publicar(self, caminho: str, corpo: bytes) -> str:
+        self.arquivos[caminho] = corpo
+        return self.base + caminho
+
+    def fechar(self):
+        self.servidor.shutdown()
+
+def limpar_caches():
+    for cache in (artes._CACHE_METADADOS, artes._CACHE_MATERIAS, artes._CACHE_RENDER, artes._CACHE_ARTES, CACHE_LAYOUT):
+        cache.limpar()
+
+def _status_kb(campo: str) -> int:
+    with open("/proc/self/status") as f:
+        for linha in f:
+            if linha.startswith(campo + ":"):
+                return int(linha.split()[1])
+    return 0
+
+def medir_pico(fn):
+    """MB de memória residente acima do início durante ``fn`` (Linux; None se indisponível)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")        # zera o VmHWM (pico) do processo
+        inicio = _status_kb("VmRSS")
+    except OSError:
+        fn()
+        return None
+    fn()
+    return (_status_kb("VmHWM") - inicio) / 1024
+
+def medir_etapas(url: str, perfil, repeticoes: int) -> dict:
+    """Mediana (ms) de cada etapa do pipeline para uma matéria."""
+    tempos = {}
+
+    def cronometrar(etapa, fn, *args):
+        t0 = time.perf_counter()
+        resultado = fn(*args)
+        tempos.setdefault(etapa, []).append((time.perf_counter() - t0) * 1000)
+        return resultado
+
+    for _ in range(repeticoes):
+        limpar_caches()
+        html = cronometrar("pagina", artes.safe_get_text, url)
+        dados = cronometrar("extracao", extrair_dados_materia, html, url)
+        foto = cronometrar("download", artes.safe_get_bytes, dados.img_url)
+        imagem = cronometrar("decodificacao", artes.decodificar_imagem, foto)
+        materia = artes.MateriaBaixada(url, dados.titulo, dados.img_url, "", imagem)
+        for tipo in ("FEED", "STORY"):
+            CACHE_LAYOUT.limpar()
+            arte = cronometrar(tipo.lower(), artes.renderizar_arte, materia, tipo)
+            cronometrar(f"codif_{tipo.lower()}", artes.codificar, arte, perfil)
+    return {etapa: statistics.median(v) for etapa, v in tempos.items()}
+
+def pipeline_completo(url: str, perfil: str):
+    limpar_caches()
+    for tipo in ("FEED", "STORY"):
+        artes.gerar_arte(url, tipo, perfil=perfil)
+
+def medir_vazao(urls, perfil: str, workers: int, rodadas: int) -> float:
+    """Artes (FEED + STORY contam 2) por segundo, sem cache entre as matérias."""
+    limpar_caches()
+    lote = [f"{u}?r={r}" for r in range(rodadas) for u in urls]
+    t0 = time.perf_counter()
+    falhas = [erro for _, _, _, erro in artes.gerar_lote(lote, max_workers=workers, perfil=perfil) if erro]
+    if falhas:
+        raise RuntimeError(falhas[0])
+    return 2 * len(lote) / (time.perf_counter() - t0)
+
+def comparar(medidas: dict, base: dict, tolerancia: float) -> list:
+    regressoes = []
+    for chave, valor in sorted(medidas.items()):
+        ref = base.get(chave)
+        if ref is None or valor is None:
+            continue
+        if chave.startswith("vazao/"):
+            if valor < ref * (1 - tolerancia):
+                regressoes.append(f"{chave}: {valor:.2f} < {ref:.2f} art/s")
+        elif valor > ref * (1 + tolerancia) + (0 if chave.endswith("pico_mb") else FOLGA_MS):
+            regressoes.append(f"{chave}: {valor:.1f} > {ref:.1f}")
+    return regressoes
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--repeticoes", type=int, default=5)
+    parser.add_argument("-p", "--perfil", choices=sorted(artes.PERFIS), default=artes.PERFIL_PADRAO)
+    parser.add_argument("--rodadas", type=int, default=2, help="passadas por todos os casos na medida de vazão")
+    parser.add_argument("--tolerancia", type=float, default=None, help="folga sobre a linha de base (0.5 = 50%%)")
+    parser.add_argument("--gravar-base", action="store_true", help="grava as medidas como nova linha de base")
+    args = parser.parse_args(argv)
+
+    artes.garantir_fonte()
+    artes.aquecer_templates()
+    perfil = artes.PERFIS[args.perfil]
+    materias, _ = carregar_paginas()
+    html_base = materias[0][1]
+
+    site = SiteLocal()
+    urls = {}
+    try:
+        for nome, (larg, alt, formato, ext, modo) in CASOS.items():
+            url_foto = site.publicar(f"/fotos/{nome}.{ext}", gerar_foto(larg, alt, formato, modo))
+            html = pagina_com_foto(html_base, url_foto)
+            urls[nome] = site.publicar(f"/2024/05/materia-{nome}.html", html.encode("utf-8"))
+
+        medidas = {}
+        etapas = None
+        for nome, url in urls.items():
+            resultado = medir_etapas(url, perfil, args.repeticoes)
+            if etapas is None:
+                etapas = list(resultado)
+                print(f"{'caso':<10}" + "".join(f"{e:>14}" for e in etapas) + f"{'pico MB':>9}")
+            pico = medir_pico(lambda: pipeline_completo(url, args.perfil))
+            medidas.update({f"{nome}/{e}": ms for e, ms in resultado.items()})
+            medidas[f"{nome}/pico_mb"] = pico
+            pico_txt = f"{pico:>9.0f}" if pico is not None else f"{'n/d':>9}"
+            print(f"{nome:<10}" + "".join(f"{resultado[e]:>14.1f}" for e in etapas) + pico_txt)
+
+        nucleos = os.cpu_count() or 1
+        serial = medir_vazao(urls.values(), args.perfil, 1, args.rodadas)
+        paralelo = medir_vazao(urls.values(), args.perfil, nucleos, args.rodadas)
+        medidas["vazao/1_thread"] = serial
+        medidas["vazao/por_nucleo"] = paralelo / nucleos
+        print(f"\nvazão: {serial:.2f} art/s em 1 thread, {paralelo:.2f} art/s com {nucleos} "
+              f"thread(s) ({paralelo / nucleos:.2f} por núcleo) — perfil {args.perfil}")
+    finally:
+        site.fechar()
+
+    if args.gravar_base:
+        with open(ARQUIVO_BASE, "w", encoding="utf-8") as f:
+            json.dump({"perfil": args.perfil, "repeticoes": args.repeticoes, "tolerancia": TOLERANCIA_PADRAO,
+                       "medidas": {k: round(v, 2) for k, v in medidas.items() if v is not None}},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"linha de base gravada em {os.path.relpath(ARQUIVO_BASE)}")
+        return 0
+
+    if not os.path.exists(ARQUIVO_BASE):
+        print("sem linha de base (use --gravar-base)")
+        return 0
+    with open(ARQUIVO_BASE, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("perfil") != args.perfil:
+        print(f"linha de base gravada com o perfil {base.get('perfil')}; comparação ignorada")
+        return 0
+    if base.get("repeticoes", args.repeticoes) != args.repeticoes:
+        # O pico de memória depende de quanto o heap já cresceu nas repetições anteriores
+        base["medidas"] = {k: v for k, v in base["medidas"].items() if not k.endswith("pico_mb")}
+        print(f"linha de base gravada com -n {base['repeticoes']}; pico de memória não comparado")
+    tolerancia = args.tolerancia if args.tolerancia is not None else base.get("tolerancia", TOLERANCIA_PADRAO)
+    regressoes = comparar(medidas, base["medidas"], tolerancia)
+    for r in regressoes:
+        print("REGRESSÃO", r)
+    print("dentro da linha de base" if not regressoes else f"{len(regressoes)} regressão(ões)")
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Cache em disco das fotos baixadas das matérias.
+
+Os bytes ficam em arquivos nomeados pelo SHA-256 do conteúdo (a mesma foto
+vinda de URLs diferentes é guardada uma vez só) e um índice SQLite liga cada
+URL ao seu hash, ao ETag/Last-Modified e ao último acesso, usado no LRU.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from medicao import ConexaoMedida
+
+class CacheImagens:
+    """Cache persistente de imagens por URL com revalidação condicional."""
+
+    def __init__(self, pasta: str, max_bytes: int, frescor: float):
+        self.pasta = pasta
+        self.max_bytes = max_bytes
+        self.frescor = frescor          # segundos sem revalidar com o servidor
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._contadores = {"hits": 0, "revalidados": 0, "misses": 0}
+
+    @property
+    def ativo(self) -> bool:
+        return self.max_bytes > 0
+
+    def _conn(self) -> sqlite3.Connection:
+        # Uma conexão por thread; o índice é criado no primeiro uso
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(self.pasta, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.pasta, "indice.db"), timeout=10, factory=ConexaoMedida)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS imagens (
+                    url TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    validado_em REAL NOT NULL,
+                    acessado_em REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_imagens_acesso ON imagens (acessado_em)")
+            self._local.conn = conn
+        return conn
+
+    def _caminho(self, sha: str) -> str:
+        return os.path.join(self.pasta, sha + ".img")
+
+    def _ler(self, sha: str):
+        try:
+            with open(self._caminho(sha), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _gravar(self, sha: str, dados: bytes):
+        destino = self._caminho(sha)
+        if os.path.exists(destino):
+            return
+        tmp = f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(dados)
+        os.replace(tmp, destino)
+
+    def _contar(self, nome: str):
+        with self._lock:
+            self._contadores[nome] += 1
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            stats = dict(self._contadores)
+        total = sum(stats.values())
+        stats["taxa_acerto"] = (stats["hits"] + stats["revalidados"]) / total if total else 0.0
+        return stats
+
+    def buscar(self, url: str, baixar) -> bytes:
+        """Devolve os bytes da imagem, baixando só quando necessário.
+
+        ``baixar(url, etag, last_modified)`` deve devolver
+        ``(dados, etag, last_modified)``, com ``dados=None`` quando o servidor
+        responder 304 (Not Modified).
+        """
+        if not self.ativo:
+            return baixar(url, None, None)[0]
+
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT sha256, etag, last_modified, validado_em FROM imagens WHERE url=?", (url,)
+        ).fetchone()
+        dados = self._ler(row[0]) if row else None
+        agora = time.time()
+
+        if dados is not None and agora - row[3] < self.frescor:
+            with conn:
+                conn.execute("UPDATE imagens SET acessado_em=? WHERE url=?", (agora, url))
+            self._contar("hits")
+            return dados
+
+        etag, last_modified = (row[1], row[2]) if dados is not None else (None, None)
+        novos, etag_n, last_modified_n = baixar(url, etag, last_modified)
+
+        if novos is None and dados is not None:
+            with conn:
+                conn.execute(
+                    "UPDATE imagens SET validado_em=?, acessado_em=? WHERE url=?", (agora, agora, url)
+                )
+            self._contar("revalidados")
+            return dados
+        if novos is None:
+            # 304 sem termos a cópia: pede de novo sem cabeçalhos condicionais
+            novos, etag_n, last_modified_n = baixar(url, None, None)
+
+        sha = hashlib.sha256(novos).hexdigest()
+        self._gravar(sha, novos)
+        with conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO imagens
+                (url, sha256, tamanho, etag, last_modified, validado_em, acessado_em)
+                VALUES (?,?,?,?,?,?,?)
+                """,
+                (url, sha, len(novos), etag_n, last_modified_n, agora, agora),
+            )
+            # A URL trocou de conteúdo: o arquivo antigo sairia da soma do LRU e ficaria no disco
+            if row and row[0] != sha:
+                self._remover_se_orfao(conn, row[0])
+            self._podar(conn)
+        self._contar("misses")
+        return novos
+
+    def _podar(self, conn: sqlite3.Connection):
+        # LRU pelo último acesso até caber no limite (fotos repetidas contam uma vez por URL)
+        total = conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM imagens").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        antigos = conn.execute("SELECT url, sha256, tamanho FROM imagens ORDER BY acessado_em ASC").fetchall()
+        for url, sha, tamanho in antigos:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM imagens WHERE url=?", (url,))
+            total -= tamanho
+            self._remover_se_orfao(conn, sha)
+
+    def _remover_se_orfao(self, conn: sqlite3.Connection, sha: str):
+        # Apaga o arquivo quando nenhuma URL aponta mais para esse conteúdo
+        if not conn.execute("SELECT 1 FROM imagens WHERE sha256=? LIMIT 1", (sha,)).fetchone():
+            try:
+                os.remove(self._caminho(sha))
+            except OSError:
+                pass
@@ -0,0 +1,43 @@
+"""Contadores dos KPIs, mantidos por triggers (migração 4).
+
+O painel lê um valor pronto em vez de rodar COUNT(*) a cada rerun. A
+conferência recalcula tudo do zero e corrige o que tiver divergido; roda
+como tarefa diária da manutenção.
+"""
+
+# Contagem de referência de cada contador (o que os triggers mantêm de forma incremental)
+CONTAGENS = (
+    "SELECT 'pautas_abertas', COUNT(*) FROM pautas_trabalho WHERE status != 'Concluído'",
+    "SELECT 'agenda_pendente:' || criado_por, COUNT(*) FROM agenda_itens "
+    "WHERE status = 'Pendente' AND criado_por IS NOT NULL GROUP BY criado_por",
+)
+
+def ler_contadores(conn, *nomes: str) -> dict:
+    """{nome: valor}; contador que ainda não existe vale 0."""
+    marcadores = ",".join("?" * len(nomes))
+    valores = dict(conn.execute(f"SELECT nome, valor FROM contadores WHERE nome IN ({marcadores})", nomes).fetchall())
+    return {nome: valores.get(nome, 0) for nome in nomes}
+
+def conferir_contadores(conn) -> dict:
+    """Recalcula os contadores e corrige os divergentes; devolve {nome: (guardado, real)}."""
+    # BEGIN IMMEDIATE: nenhuma escrita entra entre a contagem e a correção
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        reais = {}
+        for sql in CONTAGENS:
+            reais.update(conn.execute(sql).fetchall())
+        guardados = dict(conn.execute("SELECT nome, valor FROM contadores").fetchall())
+        divergentes = {
+            nome: (guardados.get(nome), reais.get(nome, 0))
+            for nome in set(reais) | set(guardados)
+            if guardados.get(nome) != reais.get(nome, 0)
+        }
+        conn.executemany(
+            "INSERT OR REPLACE INTO contadores (nome, valor) VALUES (?, ?)",
+            [(nome, real) for nome, (_, real) in divergentes.items()],
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return divergentes
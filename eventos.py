@@ -0,0 +1,34 @@
+"""Avisos de mudança (fila de pautas e agenda) entre as sessões do painel.
+
+Cada escrita do app publica um evento com número de sequência crescente. Cada
+sessão guarda o último número que já desenhou; um fragmento de 1 s compara
+com o canal (só memória, sem consulta ao banco) e dispara o rerun quando há
+novidade.
+"""
+import threading
+import time
+from collections import deque
+
+class CanalEventos:
+    """Pub/sub em memória, para as sessões do mesmo processo."""
+
+    def __init__(self, max_eventos: int = 200):
+        self._lock = threading.Lock()
+        self._sequencia = 0
+        self._recentes = deque(maxlen=max_eventos)
+
+    def publicar(self, topico: str, acao: str, **dados) -> int:
+        with self._lock:
+            self._sequencia += 1
+            self._recentes.append(dict(dados, seq=self._sequencia, topico=topico, acao=acao, ts=time.time()))
+            return self._sequencia
+
+    def sequencia(self) -> int:
+        return self._sequencia
+
+    def desde(self, sequencia: int) -> list:
+        """Eventos publicados depois de ``sequencia`` (os mais antigos podem já ter saído da janela)."""
+        with self._lock:
+            return [e for e in self._recentes if e["seq"] > sequencia]
+
+CANAL_EVENTOS = CanalEventos()
@@ -0,0 +1,218 @@
+"""Extração direcionada do HTML das matérias e da capa do site.
+
+Em vez de montar a árvore inteira do BeautifulSoup (barra lateral, widgets,
+comentários...), um HTMLParser percorre a página uma vez, guarda só o que as
+artes usam e para assim que o resultado já está decidido.
+"""
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List
+from urllib.parse import urljoin
+
+EXTENSOES_IMAGEM = re.compile(r"\.(jpg|jpeg|png|webp)(\?|$)")
+
+def normalizar_url(base: str, candidate: str) -> str:
+    if not candidate:
+        return ""
+    return urljoin(base, candidate)
+
+def avaliar_imagem(base_url: str, attrs) -> tuple:
+    """Classifica um <img>: (url, definitiva). url vazia = descartar.
+
+    ``definitiva`` indica extensão de imagem conhecida (escolha imediata);
+    as demais só valem como reserva se nenhuma definitiva aparecer.
+    """
+    src = (attrs.get("src") or "").strip()
+    data_src = (attrs.get("data-src") or "").strip()
+    data_lazy = (attrs.get("data-lazy-src") or "").strip()
+    pick = src or data_src or data_lazy
+    if not pick:
+        return "", False
+
+    full = normalizar_url(base_url, pick)
+    low = full.lower()
+
+    if "logo" in low or "icon" in low or "sprite" in low:
+        return "", False
+
+    return full, bool(EXTENSOES_IMAGEM.search(low))
+
+def escolher_imagem_util(base_url: str, imgs) -> str:
+    candidatos = []
+    for attrs in imgs:
+        full, definitiva = avaliar_imagem(base_url, attrs)
+        if not full:
+            continue
+        if definitiva:
+            return full
+        candidatos.append(full)
+    return candidatos[0] if candidatos else ""
+
+class _Concluido(Exception):
+    """Interrompe o parser quando o resultado já está decidido."""
+
+@dataclass
+class DadosMateria:
+    h1: str = None              # texto do primeiro <h1> (None se não houver)
+    title: str = None           # texto bruto do primeiro <title>
+    og: Dict[str, str] = field(default_factory=dict)
+    img_url: str = ""
+
+    @property
+    def titulo(self) -> str:
+        if self.h1:
+            return self.h1
+        if self.title and self.title.strip():
+            return self.title.strip()
+        return "Sem título"
+
+class _Regiao:
+    # Acompanha um elemento (post-body / article) pela profundidade da própria tag
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.profundidade = 1
+        self.aberta = True
+        self.imgs = []
+
+class _ExtratorMateria(HTMLParser):
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.dados = DadosMateria()
+        self._h1 = None
+        self._title = None
+        self.post_body = None
+        self.article = None
+        self.pagina = []
+        self.decidida = None        # imagem já escolhida dentro do post-body
+
+    def _terminou(self) -> bool:
+        # post-body decidido e <h1>/<title> já lidos: o resto da página não muda nada
+        if self.post_body is None or (self.post_body.aberta and self.decidida is None):
+            return False
+        return self.dados.h1 is not None and self.dados.title is not None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        for regiao in (self.post_body, self.article):
+            if regiao is not None and regiao.aberta and regiao.tag == tag:
+                regiao.profundidade += 1
+
+        if tag == "h1" and self.dados.h1 is None and self._h1 is None:
+            self._h1 = []
+        elif tag == "title" and self.dados.title is None and self._title is None:
+            self._title = []
+        elif tag == "meta":
+            prop = attrs.get("property") or ""
+            if prop.startswith("og:") and attrs.get("content"):
+                self.dados.og[prop] = attrs["content"].strip()
+        elif tag == "img":
+            for regiao in (self.post_body, self.article):
+                if regiao is not None and regiao.aberta:
+                    regiao.imgs.append(attrs)
+            self.pagina.append(attrs)
+            if self.post_body is not None and self.post_body.aberta and self.decidida is None:
+                full, definitiva = avaliar_imagem(self.base_url, attrs)
+                if definitiva:
+                    self.decidida = full
+
+        if self.post_body is None and "post-body" in (attrs.get("class") or "").split():
+            self.post_body = _Regiao(tag)
+        if self.article is None and tag == "article":
+            self.article = _Regiao(tag)
+
+        if self._terminou():
+            raise _Concluido()
+
+    def handle_endtag(self, tag):
+        for regiao in (self.post_body, self.article):
+            if regiao is not None and regiao.aberta and regiao.tag == tag:
+                regiao.profundidade -= 1
+                if regiao.profundidade == 0:
+                    regiao.aberta = False
+
+        if tag == "h1" and self._h1 is not None:
+            self.dados.h1 = " ".join(p for p in self._h1 if p)
+            self._h1 = None
+        elif tag == "title" and self._title is not None:
+            self.dados.title = "".join(self._title)
+            self._title = None
+
+        if self._terminou():
+            raise _Concluido()
+
+    def handle_data(self, data):
+        if self._h1 is not None:
+            self._h1.append(data.strip())
+        if self._title is not None:
+            self._title.append(data)
+
+def extrair_dados_materia(html: str, base_url: str) -> DadosMateria:
+    """Título, og:* e imagem principal da matéria, parando cedo quando possível."""
+    parser = _ExtratorMateria(base_url)
+    try:
+        parser.feed(html)
+        parser.close()
+    except _Concluido:
+        pass
+
+    # Mesma prioridade do BeautifulSoup: post-body, depois <article>, depois a página
+    dados = parser.dados
+    if parser._h1 is not None and dados.h1 is None:
+        dados.h1 = " ".join(p for p in parser._h1 if p)
+    if parser._title is not None and dados.title is None:
+        dados.title = "".join(parser._title)
+    if parser.post_body is not None:
+        dados.img_url = parser.decidida or escolher_imagem_util(base_url, parser.post_body.imgs)
+    elif parser.article is not None:
+        dados.img_url = escolher_imagem_util(base_url, parser.article.imgs)
+    else:
+        dados.img_url = escolher_imagem_util(base_url, parser.pagina)
+    return dados
+
+class _ExtratorLinks(HTMLParser):
+    def __init__(self, base: str, limite: int):
+        super().__init__(convert_charrefs=True)
+        self.base = base
+        self.limite = limite
+        self.itens = []
+        self._vistos = set()
+        self._href = None
+        self._texto = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        href = dict(attrs).get("href")
+        if href is None:
+            return
+        self._href = href.strip()
+        self._texto = []
+
+    def handle_endtag(self, tag):
+        if tag != "a" or self._href is None:
+            return
+        href, t = self._href, "".join(self._texto)
+        self._href = self._texto = None
+        if ".html" in href and "/20" in href and len(t) > 25:
+            u = urljoin(self.base, href)
+            if u not in self._vistos:
+                self._vistos.add(u)
+                self.itens.append({"t": t, "u": u})
+                if len(self.itens) >= self.limite:
+                    raise _Concluido()
+
+    def handle_data(self, data):
+        if self._texto is not None:
+            self._texto.append(data.strip())
+
+def extrair_links_materias(html: str, base: str, limite: int = 12) -> List[dict]:
+    """Links de matérias da capa ({"t": título, "u": url}), sem repetir, até ``limite``."""
+    parser = _ExtratorLinks(base, limite)
+    try:
+        parser.feed(html)
+        parser.close()
+    except _Concluido:
+        pass
+    return parser.itens
@@ -0,0 +1,206 @@
+"""Últimas matérias pelo feed Atom/RSS do Blogger, guardadas em SQLite.
+
+Cada atualização é um GET condicional (ETag / If-Modified-Since) pedindo só
+o que mudou desde a última entrada vista (``updated-min``); quando nada é
+novo o servidor responde 304 e a lista sai direto do banco.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import List
+from urllib.parse import urlencode
+
+from extracao import extrair_dados_materia
+from medicao import ConexaoMedida
+
+NS = {"atom": "http://www.w3.org/2005/Atom", "media": "http://search.yahoo.com/mrss/"}
+
+# Miniatura do Blogger (…/s72-c/foto.jpg ou …=s72-c) → versão grande
+_RE_MINIATURA_PASTA = re.compile(r"/s\d+(-c)?/")
+_RE_MINIATURA_SUFIXO = re.compile(r"=s\d+(-c)?$")
+
+@dataclass(frozen=True)
+class EntradaFeed:
+    url: str
+    titulo: str
+    publicado: float        # epoch
+    atualizado: float       # epoch
+    atualizado_txt: str     # como veio no feed, usado no updated-min
+    img_url: str
+
+def _data_iso(texto: str) -> float:
+    return datetime.fromisoformat(texto.strip()).timestamp()
+
+def _data_rfc822(texto: str) -> float:
+    return parsedate_to_datetime(texto.strip()).timestamp()
+
+def ampliar_miniatura(url: str) -> str:
+    url = _RE_MINIATURA_PASTA.sub("/s1600/", url)
+    return _RE_MINIATURA_SUFIXO.sub("=s1600", url)
+
+def _imagem_da_entrada(conteudo: str, url: str, miniatura) -> str:
+    # Primeira imagem útil do corpo (mesma regra da página); a miniatura é reserva
+    if conteudo:
+        img = extrair_dados_materia(conteudo, url).img_url
+        if img:
+            return img
+    if miniatura is not None and miniatura.get("url"):
+        return ampliar_miniatura(miniatura.get("url"))
+    return ""
+
+def interpretar_feed(dados: bytes) -> List[EntradaFeed]:
+    """Entradas de um feed Atom (padrão do Blogger) ou RSS 2.0."""
+    raiz = ET.fromstring(dados)
+    entradas = []
+    if raiz.tag == f"{{{NS['atom']}}}feed":
+        for e in raiz.findall("atom:entry", NS):
+            link = next((l.get("href") for l in e.findall("atom:link", NS) if l.get("rel") == "alternate"), None)
+            if not link:
+                continue
+            publicado = e.findtext("atom:published", "", NS) or e.findtext("atom:updated", "", NS)
+            atualizado = e.findtext("atom:updated", "", NS) or publicado
+            entradas.append(EntradaFeed(
+                url=link,
+                titulo=(e.findtext("atom:title", "", NS) or "").strip(),
+                publicado=_data_iso(publicado),
+                atualizado=_data_iso(atualizado),
+                atualizado_txt=atualizado.strip(),
+                img_url=_imagem_da_entrada(e.findtext("atom:content", "", NS), link, e.find("media:thumbnail", NS)),
+            ))
+    else:
+        for item in raiz.iter("item"):
+            link = (item.findtext("link") or "").strip()
+            if not link:
+                continue
+            data = item.findtext("pubDate") or ""
+            quando = _data_rfc822(data) if data else time.time()
+            entradas.append(EntradaFeed(
+                url=link,
+                titulo=(item.findtext("title") or "").strip(),
+                publicado=quando,
+                atualizado=quando,
+                atualizado_txt="",
+                img_url=_imagem_da_entrada(item.findtext("description") or "", link, item.find("media:thumbnail", NS)),
+            ))
+    return entradas
+
+class FeedMaterias:
+    """Histórico das matérias vistas no feed, atualizado de forma incremental."""
+
+    def __init__(self, caminho_db: str, feed_url: str, max_resultados: int = 25):
+        self.caminho_db = caminho_db
+        self.feed_url = feed_url
+        self.max_resultados = max_resultados
+        self._local = threading.local()
+        self._lock = threading.Lock()      # uma atualização por vez
+        self._contadores = {"novas": 0, "nao_modificado": 0, "baixados": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.caminho_db) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.caminho_db, timeout=10, factory=ConexaoMedida)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS materias (
+                    url TEXT PRIMARY KEY,
+                    titulo TEXT NOT NULL,
+                    publicado REAL NOT NULL,
+                    atualizado REAL NOT NULL,
+                    img_url TEXT,
+                    visto_em REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_materias_publicado ON materias (publicado DESC)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS feed_estado (
+                    feed_url TEXT PRIMARY KEY,
+                    pedido TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    atualizado_max TEXT,
+                    verificado_em REAL NOT NULL
+                )
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return dict(self._contadores)
+
+    def _url_pedido(self, atualizado_max: str) -> str:
+        params = {"max-results": self.max_resultados}
+        if atualizado_max:
+            params["updated-min"] = atualizado_max
+        separador = "&" if "?" in self.feed_url else "?"
+        return f"{self.feed_url}{separador}{urlencode(params)}"
+
+    def atualizar(self, baixar) -> int:
+        """Busca o que mudou no feed e grava; devolve quantas entradas chegaram.
+
+        ``baixar(url, etag, last_modified)`` deve devolver
+        ``(dados, etag, last_modified)``, com ``dados=None`` no 304.
+        """
+        with self._lock:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT pedido, etag, last_modified, atualizado_max FROM feed_estado WHERE feed_url=?", (self.feed_url,)
+            ).fetchone()
+            pedido_ant, etag, last_modified, atualizado_max = row or (None, None, None, None)
+
+            # O ETag vale para a URL exata do pedido anterior; com updated-min novo, pede sem condição
+            pedido = self._url_pedido(atualizado_max)
+            if pedido != pedido_ant:
+                etag = last_modified = None
+            dados, etag_n, last_modified_n = baixar(pedido, etag, last_modified)
+            agora = time.time()
+            if dados is None:
+                with conn:
+                    conn.execute("UPDATE feed_estado SET verificado_em=? WHERE feed_url=?", (agora, self.feed_url))
+                self._contadores["nao_modificado"] += 1
+                return 0
+
+            entradas = interpretar_feed(dados)
+            if entradas:
+                mais_recente = max(entradas, key=lambda e: e.atualizado)
+                atualizado_max = mais_recente.atualizado_txt or atualizado_max
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO materias (url, titulo, publicado, atualizado, img_url, visto_em)
+                    VALUES (?,?,?,?,?,?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        titulo=excluded.titulo,
+                        atualizado=excluded.atualizado,
+                        img_url=COALESCE(NULLIF(excluded.img_url, ''), materias.img_url)
+                    """,
+                    [(e.url, e.titulo, e.publicado, e.atualizado, e.img_url, agora) for e in entradas],
+                )
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO feed_estado (feed_url, pedido, etag, last_modified, atualizado_max, verificado_em)
+                    VALUES (?,?,?,?,?,?)
+                    """,
+                    (self.feed_url, pedido, etag_n, last_modified_n, atualizado_max, agora),
+                )
+            self._contadores["baixados"] += 1
+            self._contadores["novas"] += len(entradas)
+            return len(entradas)
+
+    def ultimas(self, limite: int = 12) -> List[dict]:
+        """Mais recentes primeiro, no formato da lista da capa ({"t", "u"} + img e data)."""
+        rows = self._conn().execute(
+            "SELECT titulo, url, img_url, publicado FROM materias ORDER BY publicado DESC LIMIT ?", (limite,)
+        ).fetchall()
+        return [{"t": t, "u": u, "img": img or "", "publicado": pub} for t, u, img, pub in rows]
@@ -0,0 +1,84 @@
+"""Linha de comando: gera as artes FEED/STORY sem abrir o painel.
+
+Exemplos:
+    python gerar_artes.py https://www.destaquetoledo.com.br/2024/05/materia.html
+    python gerar_artes.py -a urls.txt -o saida --formato FEED
+    python gerar_artes.py --ultimas -o saida
+"""
+import argparse
+import os
+import sys
+
+from artes import (
+    CACHE_IMAGENS,
+    LOTE_WORKERS,
+    PERFIL_PADRAO,
+    PERFIS,
+    buscar_ultimas_materias,
+    gerar_lote,
+    nome_arquivo_arte,
+)
+from layout_texto import CACHE_LAYOUT
+
+FORMATOS = {
+    "FEED": ("FEED",),
+    "STORY": ("STORY",),
+    "AMBOS": ("FEED", "STORY"),
+}
+
+def ler_urls(args) -> list:
+    urls = list(args.urls)
+    if args.arquivo:
+        if args.arquivo == "-":
+            linhas = sys.stdin.readlines()
+        else:
+            with open(args.arquivo, encoding="utf-8") as f:
+                linhas = f.readlines()
+        for linha in linhas:
+            linha = linha.strip()
+            if linha and not linha.startswith("#"):
+                urls.append(linha)
+    if args.ultimas:
+        urls.extend(item["u"] for item in buscar_ultimas_materias())
+    return urls
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gera as artes FEED/STORY do Destaque Toledo.")
+    parser.add_argument("urls", nargs="*", help="links das matérias")
+    parser.add_argument("-a", "--arquivo", help="arquivo com uma URL por linha ('-' para stdin)")
+    parser.add_argument("--ultimas", action="store_true", help="inclui as últimas matérias do site")
+    parser.add_argument("-o", "--saida", default="artes", help="pasta de saída (padrão: artes)")
+    parser.add_argument("-f", "--formato", choices=sorted(FORMATOS), default="AMBOS")
+    parser.add_argument("-p", "--perfil", choices=sorted(PERFIS), default=PERFIL_PADRAO, help="codificação do arquivo")
+    parser.add_argument("-j", "--workers", type=int, default=LOTE_WORKERS, help="renderizações em paralelo")
+    args = parser.parse_args(argv)
+
+    urls = ler_urls(args)
+    if not urls:
+        parser.error("informe ao menos uma URL, --arquivo ou --ultimas.")
+
+    os.makedirs(args.saida, exist_ok=True)
+    falhas = 0
+    for i, u, arquivos, erro in gerar_lote(urls, FORMATOS[args.formato], args.workers, args.perfil):
+        if erro:
+            falhas += 1
+            print(f"ERRO {u}: {erro}", file=sys.stderr)
+            continue
+        for tipo, dados in arquivos.items():
+            caminho = os.path.join(args.saida, nome_arquivo_arte(i, u, tipo, args.perfil))
+            with open(caminho, "wb") as f:
+                f.write(dados)
+            print(caminho)
+
+    if CACHE_IMAGENS.ativo:
+        stats = CACHE_IMAGENS.estatisticas()
+        print(
+            f"cache de imagens: {stats['hits']} hits, {stats['revalidados']} revalidadas, {stats['misses']} misses",
+            file=sys.stderr,
+        )
+    stats = CACHE_LAYOUT.estatisticas()
+    print(f"cache de layout: {stats['hits']} hits, {stats['misses']} misses", file=sys.stderr)
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Layout do título das artes: quebra de linha por largura real em pixels.
+
+Cada (fonte, tamanho) tem um medidor com cache das larguras já medidas, e o
+ajuste devolve tamanho, linhas e posições de uma vez, pronto para desenhar.
+Layouts prontos ficam num LRU por (título, fonte, regra).
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import List, Tuple
+
+from PIL import ImageFont
+
+@dataclass(frozen=True)
+class RegraTitulo:
+    """Regras de layout do título de um formato (caixa, linhas e espaçamentos)."""
+    tam_max: int
+    tam_min: int
+    passo: int
+    largura_max: int        # largura máxima de cada linha, em pixels
+    alt_max: int            # altura máxima do bloco de texto
+    max_linhas: int
+    entrelinha: int         # espaço entre linhas no cálculo do bloco
+    passo_desenho: int      # espaço extra entre linhas na hora de desenhar
+    x: int                  # esquerda do texto (ou centro, se centralizar)
+    y: int                  # topo do bloco (ou centro, se centralizar)
+    centralizar: bool = False
+    folga_bloco: int = 0    # espaço extra somado ao bloco inteiro
+    balancear: bool = False # distribui as palavras para linhas de largura parecida
+
+@dataclass(frozen=True)
+class TituloAjustado:
+    tam: int
+    fonte: ImageFont.FreeTypeFont
+    linhas: Tuple[str, ...]
+    larguras: Tuple[float, ...]
+    alt_bloco: int
+    posicoes: Tuple[Tuple[int, int], ...] = ()
+
+@lru_cache(maxsize=None)
+def carregar_fonte(caminho: str, tam: int) -> ImageFont.FreeTypeFont:
+    # Um objeto de fonte por tamanho para o processo inteiro (sem reler o .ttf)
+    return ImageFont.truetype(caminho, tam)
+
+class MedidorFonte:
+    """Larguras de texto em um tamanho de fonte, com LRU por palavra.
+
+    A palavra é medida inteira com getlength (avanços dos glifos + kerning),
+    então a soma das palavras e espaços bate com o que o Pillow desenha.
+    O LRU guarda as palavras dos títulos recentes; as antigas saem.
+    """
+
+    def __init__(self, fonte: ImageFont.FreeTypeFont, max_palavras: int = 2048):
+        self.fonte = fonte
+        self.espaco = fonte.getlength(" ")
+        self.max_palavras = max_palavras
+        self._larguras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def largura(self, palavra: str) -> float:
+        with self._lock:
+            larg = self._larguras.get(palavra)
+            if larg is not None:
+                self._larguras.move_to_end(palavra)
+                return larg
+        larg = self.fonte.getlength(palavra)
+        with self._lock:
+            self._larguras[palavra] = larg
+            if len(self._larguras) > self.max_palavras:
+                self._larguras.popitem(last=False)
+        return larg
+
+@lru_cache(maxsize=None)
+def medidor(caminho: str, tam: int) -> MedidorFonte:
+    return MedidorFonte(carregar_fonte(caminho, tam))
+
+def quebrar_linhas(palavras: List[str], med: MedidorFonte, largura_max: float) -> List[Tuple[List[str], float]]:
+    """Quebra gulosa por pixels: cada linha recebe palavras enquanto couberem."""
+    linhas = []
+    atual, larg_atual = [], 0.0
+    for palavra in palavras:
+        larg = med.largura(palavra)
+        if atual and larg_atual + med.espaco + larg > largura_max:
+            linhas.append((atual, larg_atual))
+            atual, larg_atual = [], 0.0
+        larg_atual = larg if not atual else larg_atual + med.espaco + larg
+        atual.append(palavra)
+    if atual:
+        linhas.append((atual, larg_atual))
+    return linhas
+
+def balancear_linhas(palavras: List[str], med: MedidorFonte, largura_max: float):
+    """Mesmo número de linhas da quebra gulosa, com a menor largura máxima possível."""
+    linhas = quebrar_linhas(palavras, med, largura_max)
+    if len(linhas) < 2:
+        return linhas
+    lo = max(med.largura(p) for p in palavras)
+    hi = max(larg for _, larg in linhas)
+    while hi - lo > 1:
+        meio = (lo + hi) / 2
+        if len(quebrar_linhas(palavras, med, meio)) <= len(linhas):
+            hi = meio
+        else:
+            lo = meio
+    return quebrar_linhas(palavras, med, hi)
+
+def altura_bloco(n_linhas: int, tam: int, regra: RegraTitulo) -> int:
+    return (n_linhas * tam) + (max(n_linhas - 1, 0) * regra.entrelinha) + regra.folga_bloco
+
+def layout_no_tamanho(titulo: str, regra: RegraTitulo, caminho_fonte: str, tam: int) -> TituloAjustado:
+    med = medidor(caminho_fonte, tam)
+    palavras = titulo.split()
+    quebra = balancear_linhas if regra.balancear else quebrar_linhas
+    linhas = quebra(palavras, med, regra.largura_max)
+    return TituloAjustado(
+        tam=tam,
+        fonte=med.fonte,
+        linhas=tuple(" ".join(p) for p, _ in linhas),
+        larguras=tuple(larg for _, larg in linhas),
+        alt_bloco=altura_bloco(len(linhas), tam, regra),
+    )
+
+def posicionar(aj: TituloAjustado, regra: RegraTitulo) -> TituloAjustado:
+    """Ponto de desenho (x, y) de cada linha, conforme a ancoragem da regra."""
+    y = regra.y - aj.alt_bloco // 2 if regra.centralizar else regra.y
+    posicoes = []
+    for larg in aj.larguras:
+        x = regra.x - int(larg // 2) if regra.centralizar else regra.x
+        posicoes.append((x, y))
+        y += aj.tam + regra.passo_desenho
+    return replace(aj, posicoes=tuple(posicoes))
+
+def cabe(aj: TituloAjustado, regra: RegraTitulo) -> bool:
+    return (
+        len(aj.linhas) <= regra.max_linhas
+        and aj.alt_bloco <= regra.alt_max
+        and all(larg <= regra.largura_max for larg in aj.larguras)
+    )
+
+def _buscar_tamanho(titulo: str, regra: RegraTitulo, caminho_fonte: str) -> TituloAjustado:
+    # Maior tamanho de fonte em que o título cabe na caixa, via busca binária
+    tamanhos = list(range(regra.tam_max, regra.tam_min - 1, -regra.passo))[::-1]
+
+    # Se nada couber, fica com o menor tamanho (mesmo comportamento do laço antigo)
+    melhor = None
+    lo, hi = 0, len(tamanhos) - 1
+    while lo <= hi:
+        meio = (lo + hi) // 2
+        aj = layout_no_tamanho(titulo, regra, caminho_fonte, tamanhos[meio])
+        if cabe(aj, regra):
+            melhor = aj
+            lo = meio + 1
+        else:
+            hi = meio - 1
+    return melhor or layout_no_tamanho(titulo, regra, caminho_fonte, tamanhos[0])
+
+class CacheLayout:
+    """LRU de layouts prontos, com contagem de acertos para acompanhamento."""
+
+    def __init__(self, max_entradas: int):
+        self.max_entradas = max_entradas
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {"hits": 0, "misses": 0}
+
+    def obter(self, chave):
+        with self._lock:
+            aj = self._dados.get(chave)
+            if aj is None:
+                self._contadores["misses"] += 1
+                return None
+            self._dados.move_to_end(chave)
+            self._contadores["hits"] += 1
+            return aj
+
+    def guardar(self, chave, aj: TituloAjustado):
+        with self._lock:
+            self._dados[chave] = aj
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            stats = dict(self._contadores, entradas=len(self._dados))
+        total = stats["hits"] + stats["misses"]
+        stats["taxa_acerto"] = stats["hits"] / total if total else 0.0
+        return stats
+
+CACHE_LAYOUT = CacheLayout(512)
+
+def normalizar_titulo(titulo: str) -> str:
+    # A quebra só enxerga palavras: espaços extras e quebras de linha não mudam o layout
+    return " ".join(titulo.split())
+
+def ajustar_titulo(titulo: str, regra: RegraTitulo, caminho_fonte: str) -> TituloAjustado:
+    """Layout do título (tamanho, linhas e posições), reaproveitado do cache quando possível."""
+    chave = (normalizar_titulo(titulo), caminho_fonte, regra)
+    aj = CACHE_LAYOUT.obter(chave)
+    if aj is None:
+        aj = posicionar(_buscar_tamanho(chave[0], regra, caminho_fonte), regra)
+        CACHE_LAYOUT.guardar(chave, aj)
+    return aj
@@ -0,0 +1,120 @@
+"""Manutenção do banco do painel em segundo plano.
+
+Limpeza da agenda, checkpoint do WAL e vacuum incremental rodam numa thread
+própria, cada tarefa no seu intervalo, com a última execução gravada na
+tabela ``manutencao`` (sobrevive a reinícios). Os reruns do painel ficam só
+com leituras.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from banco import PoolConexoes
+from contadores import conferir_contadores
+from medicao import etapa
+
+CHECKPOINT_MIN = float(os.getenv("DT_CHECKPOINT_MIN", "10"))
+DIA = 24 * 3600
+
+@dataclass(frozen=True)
+class Tarefa:
+    nome: str
+    intervalo_s: float
+    executar: Callable      # (conn) -> str, resumo gravado em ``resultado``
+
+def hoje_brasilia() -> str:
+    return (datetime.utcnow() - timedelta(hours=3)).date().strftime("%Y-%m-%d")
+
+def limpar_agenda(conn) -> str:
+    # Concluídos de dias anteriores não aparecem em nenhuma aba: só ocupam espaço
+    with conn:
+        cur = conn.execute("DELETE FROM agenda_itens WHERE status = 'Concluído' AND data_ref < ?", (hoje_brasilia(),))
+    return f"{cur.rowcount} itens removidos"
+
+def checkpoint_wal(conn) -> str:
+    # Passa o WAL para o .db e zera o arquivo de log
+    ocupado, paginas_log, copiadas = conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+    return f"{copiadas}/{paginas_log} páginas" + (" (leitor ativo)" if ocupado else "")
+
+def vacuum_incremental(conn) -> str:
+    convertido = ""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # Banco criado sem auto_vacuum: um VACUUM completo, uma única vez, para passar a INCREMENTAL
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        convertido = " (convertido para INCREMENTAL)"
+    livres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.execute("PRAGMA incremental_vacuum").fetchall()
+    return f"{livres} páginas liberadas{convertido}"
+
+def conferir_kpis(conn) -> str:
+    divergentes = conferir_contadores(conn)
+    if not divergentes:
+        return "contadores exatos"
+    return "corrigidos: " + ", ".join(f"{nome} {guardado}→{real}" for nome, (guardado, real) in sorted(divergentes.items()))
+
+TAREFAS = (
+    Tarefa("limpeza_agenda", DIA, limpar_agenda),
+    Tarefa("checkpoint_wal", CHECKPOINT_MIN * 60, checkpoint_wal),
+    Tarefa("vacuum_incremental", DIA, vacuum_incremental),
+    Tarefa("conferencia_contadores", DIA, conferir_kpis),
+)
+
+class AgendadorManutencao:
+    """Thread daemon que roda cada tarefa vencida e dorme até a próxima."""
+
+    def __init__(self, pool: PoolConexoes, tarefas=TAREFAS):
+        self.pool = pool
+        self.tarefas = tarefas
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Sobe a thread se ainda não estiver rodando; barato para chamar a cada rerun."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._laco, name="manutencao-db", daemon=True)
+                self._thread.start()
+
+    def ultimas_execucoes(self) -> list:
+        rows = self.pool.conexao().execute(
+            "SELECT tarefa, ultima_execucao, duracao_ms, resultado FROM manutencao ORDER BY tarefa"
+        ).fetchall()
+        return [{"tarefa": t, "quando": q, "ms": ms, "resultado": r} for t, q, ms, r in rows]
+
+    def _laco(self):
+        while True:
+            proxima = self.rodar_vencidas()
+            time.sleep(min(max(proxima - time.time(), 1.0), 300.0))
+
+    def rodar_vencidas(self) -> float:
+        """Roda as tarefas vencidas; devolve o instante (epoch) da próxima."""
+        conn = self.pool.conexao()
+        ultimas = dict(conn.execute("SELECT tarefa, ultima_execucao FROM manutencao").fetchall())
+        proxima = float("inf")
+        for tarefa in self.tarefas:
+            vence = ultimas.get(tarefa.nome, 0.0) + tarefa.intervalo_s
+            if vence <= time.time():
+                self._rodar(conn, tarefa)
+                vence = time.time() + tarefa.intervalo_s
+            proxima = min(proxima, vence)
+        return proxima
+
+    def _rodar(self, conn, tarefa: Tarefa):
+        inicio = time.time()
+        t0 = time.perf_counter()
+        try:
+            with etapa("manutencao." + tarefa.nome):
+                resultado = tarefa.executar(conn)
+        except Exception as e:
+            # Tenta de novo só no próximo intervalo: uma falha não vira laço quente
+            resultado = f"erro: {e}"
+        ms = (time.perf_counter() - t0) * 1000
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO manutencao (tarefa, ultima_execucao, duracao_ms, resultado) VALUES (?,?,?,?)",
+                (tarefa.nome, inicio, ms, resultado),
+            )
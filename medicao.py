@@ -0,0 +1,157 @@
+"""Tempo de cada etapa (rede, extração, renderização, SQLite) para achar gargalos.
+
+Cada medida vira uma linha JSON no log e entra num histograma em memória com
+as últimas N amostras da etapa, de onde saem p50/p95 para o painel.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+LOG_PATH = os.getenv("DT_MEDICAO_LOG", os.path.join(".cache_artes", "medicao.jsonl"))  # "" desliga, "-" = stderr
+AMOSTRAS_POR_ETAPA = int(os.getenv("DT_MEDICAO_AMOSTRAS", "500"))
+
+def _criar_logger() -> logging.Logger:
+    logger = logging.getLogger("destaque.medicao")
+    logger.propagate = False
+    if logger.handlers:
+        return logger
+    if LOG_PATH == "-":
+        handler = logging.StreamHandler()
+    elif LOG_PATH:
+        os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(LOG_PATH, maxBytes=5 * 1024 * 1024, backupCount=2, encoding="utf-8")
+    else:
+        handler = logging.NullHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
+
+LOGGER = _criar_logger()
+
+class Histograma:
+    """Janela deslizante das últimas amostras (ms) de cada etapa."""
+
+    def __init__(self, max_amostras: int):
+        self.max_amostras = max_amostras
+        self._amostras = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, etapa: str, ms: float):
+        with self._lock:
+            janela = self._amostras.get(etapa)
+            if janela is None:
+                janela = self._amostras[etapa] = deque(maxlen=self.max_amostras)
+            janela.append(ms)
+
+    def limpar(self):
+        with self._lock:
+            self._amostras.clear()
+
+    def resumo(self) -> list:
+        """[{etapa, n, p50, p95, max}] ordenado pelo p95, do mais lento ao mais rápido."""
+        with self._lock:
+            copias = {etapa: sorted(janela) for etapa, janela in self._amostras.items()}
+        linhas = []
+        for etapa, valores in copias.items():
+            if not valores:
+                continue
+            linhas.append({
+                "etapa": etapa,
+                "n": len(valores),
+                "p50": _percentil(valores, 0.50),
+                "p95": _percentil(valores, 0.95),
+                "max": valores[-1],
+            })
+        return sorted(linhas, key=lambda l: l["p95"], reverse=True)
+
+def _percentil(ordenados: list, q: float) -> float:
+    # Vizinho mais próximo: suficiente para uma janela de centenas de amostras
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+HISTOGRAMA = Histograma(AMOSTRAS_POR_ETAPA)
+
+@contextmanager
+def etapa(nome: str, **campos):
+    """Mede o bloco, registra no histograma e grava uma linha JSON no log."""
+    t0 = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        HISTOGRAMA.registrar(nome, ms)
+        if LOGGER.isEnabledFor(logging.INFO):
+            registro = {"ts": round(time.time(), 3), "etapa": nome, "ms": round(ms, 3), "ok": ok}
+            registro.update(campos)
+            LOGGER.info(json.dumps(registro, ensure_ascii=False, default=str))
+
+def medido(nome: str):
+    """Decorador: mede cada chamada da função como a etapa ``nome``."""
+    def decorador(fn):
+        @wraps(fn)
+        def envolvida(*args, **kwargs):
+            with etapa(nome):
+                return fn(*args, **kwargs)
+        return envolvida
+    return decorador
+
+# ------------------------------------------------------------
+# SQLite: conexão que mede cada comando, commit e rollback
+# ------------------------------------------------------------
+_RE_TABELA = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+(\w+)", re.IGNORECASE)
+
+@lru_cache(maxsize=256)
+def rotulo_sql(sql: str) -> str:
+    """Nome curto da consulta para o histograma: 'sql.SELECT pautas_trabalho'."""
+    texto = sql.strip()
+    verbo = texto.split(None, 1)[0].upper() if texto else "?"
+    if verbo == "PRAGMA":
+        return "sql." + texto.rstrip(";").split("=", 1)[0].split("(", 1)[0]
+    tabela = _RE_TABELA.search(texto)
+    return f"sql.{verbo} {tabela.group(1)}" if tabela else f"sql.{verbo}"
+
+class CursorMedido(sqlite3.Cursor):
+    def execute(self, sql, parametros=()):
+        with etapa(rotulo_sql(sql)):
+            return super().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        with etapa(rotulo_sql(sql)):
+            return super().executemany(sql, sequencia)
+
+class ConexaoMedida(sqlite3.Connection):
+    """Use com ``sqlite3.connect(..., factory=ConexaoMedida)``."""
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, sequencia):
+        return self.cursor().executemany(sql, sequencia)
+
+    def commit(self):
+        with etapa("sql.COMMIT"):
+            super().commit()
+
+    def rollback(self):
+        with etapa("sql.ROLLBACK"):
+            super().rollback()
+
+    def __exit__(self, tipo, valor, tb):
+        # ``with conn:`` faz commit/rollback por dentro, sem passar por commit()/rollback()
+        with etapa("sql.COMMIT" if tipo is None else "sql.ROLLBACK"):
+            return super().__exit__(tipo, valor, tb)
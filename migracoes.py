@@ -0,0 +1,193 @@
+"""Migrações versionadas do banco do painel (agenda_destaque.db).
+
+A versão fica no PRAGMA user_version. Cada migração roda uma única vez, numa
+transação própria, e bancos antigos (versão 0, criados pelo init_db antigo)
+são atualizados no lugar.
+"""
+import sqlite3
+
+# (versão, descrição, comandos)
+MIGRACOES = [
+    (1, "tabelas iniciais", [
+        # Tabela antiga (mantida por compatibilidade)
+        """
+        CREATE TABLE IF NOT EXISTS agenda (
+            dia TEXT PRIMARY KEY,
+            pauta TEXT
+        )
+        """,
+        # Pautas do Brayan
+        """
+        CREATE TABLE IF NOT EXISTS pautas_trabalho (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            titulo TEXT,
+            link_ref TEXT,
+            status TEXT,
+            data_envio TEXT,
+            prioridade TEXT,
+            observacao TEXT
+        )
+        """,
+        # Agenda unificada
+        """
+        CREATE TABLE IF NOT EXISTS agenda_itens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_ref TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            status TEXT NOT NULL DEFAULT 'Pendente',
+            criado_por TEXT,
+            criado_em TEXT
+        )
+        """,
+    ]),
+    (2, "índices das consultas de cada rerun", [
+        # Monitor do Juan e KPI do Brayan: só as pautas abertas, mais novas primeiro
+        """
+        CREATE INDEX IF NOT EXISTS idx_pautas_abertas
+        ON pautas_trabalho (id) WHERE status != 'Concluído'
+        """,
+        # Fluxo operacional do Brayan: mesma expressão do ORDER BY (sem ordenar em memória)
+        """
+        CREATE INDEX IF NOT EXISTS idx_pautas_abertas_fila
+        ON pautas_trabalho (
+            CASE WHEN prioridade = 'URGENTE' THEN 1 WHEN prioridade = 'Normal' THEN 2 ELSE 3 END, id DESC
+        ) WHERE status != 'Concluído'
+        """,
+        # Agenda do Brayan (trabalho / pessoal) e KPI de pendências
+        """
+        CREATE INDEX IF NOT EXISTS idx_agenda_status_autor_data
+        ON agenda_itens (status, criado_por, data_ref)
+        """,
+        # Agenda do Juan: intervalo de datas OU pendentes atrasados; limpeza dos concluídos
+        "CREATE INDEX IF NOT EXISTS idx_agenda_data ON agenda_itens (data_ref)",
+        "CREATE INDEX IF NOT EXISTS idx_agenda_status_data ON agenda_itens (status, data_ref)",
+    ]),
+    (3, "registro das tarefas de manutenção", [
+        """
+        CREATE TABLE IF NOT EXISTS manutencao (
+            tarefa TEXT PRIMARY KEY,
+            ultima_execucao REAL NOT NULL,
+            duracao_ms REAL,
+            resultado TEXT
+        )
+        """,
+    ]),
+    (4, "contadores dos KPIs mantidos por triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS contadores (
+            nome TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        # Carga inicial: mesma transação que cria os triggers, nada escapa entre uma coisa e outra
+        """
+        INSERT OR REPLACE INTO contadores (nome, valor)
+        SELECT 'pautas_abertas', COUNT(*) FROM pautas_trabalho WHERE status != 'Concluído'
+        """,
+        """
+        INSERT OR REPLACE INTO contadores (nome, valor)
+        SELECT 'agenda_pendente:' || criado_por, COUNT(*) FROM agenda_itens
+        WHERE status = 'Pendente' AND criado_por IS NOT NULL GROUP BY criado_por
+        """,
+        # Pautas abertas = status != 'Concluído' (NULL não conta, como no COUNT(*) antigo)
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_pautas_abertas_ins AFTER INSERT ON pautas_trabalho
+        WHEN NEW.status != 'Concluído'
+        BEGIN
+            UPDATE contadores SET valor = valor + 1 WHERE nome = 'pautas_abertas';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_pautas_abertas_del AFTER DELETE ON pautas_trabalho
+        WHEN OLD.status != 'Concluído'
+        BEGIN
+            UPDATE contadores SET valor = valor - 1 WHERE nome = 'pautas_abertas';
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_pautas_abertas_upd AFTER UPDATE OF status ON pautas_trabalho
+        WHEN (NEW.status != 'Concluído' IS 1) != (OLD.status != 'Concluído' IS 1)
+        BEGIN
+            UPDATE contadores SET valor = valor + (NEW.status != 'Concluído' IS 1) - (OLD.status != 'Concluído' IS 1)
+            WHERE nome = 'pautas_abertas';
+        END
+        """,
+        # Itens pendentes da agenda, um contador por autor ('agenda_pendente:brayan', ...)
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_agenda_pendente_ins AFTER INSERT ON agenda_itens
+        WHEN NEW.status = 'Pendente' AND NEW.criado_por IS NOT NULL
+        BEGIN
+            INSERT INTO contadores (nome, valor) VALUES ('agenda_pendente:' || NEW.criado_por, 1)
+            ON CONFLICT (nome) DO UPDATE SET valor = valor + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_agenda_pendente_del AFTER DELETE ON agenda_itens
+        WHEN OLD.status = 'Pendente' AND OLD.criado_por IS NOT NULL
+        BEGIN
+            UPDATE contadores SET valor = valor - 1 WHERE nome = 'agenda_pendente:' || OLD.criado_por;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_agenda_pendente_upd AFTER UPDATE OF status, criado_por ON agenda_itens
+        BEGIN
+            UPDATE contadores SET valor = valor - 1
+            WHERE OLD.status = 'Pendente' AND nome = 'agenda_pendente:' || OLD.criado_por;
+            INSERT INTO contadores (nome, valor)
+            SELECT 'agenda_pendente:' || NEW.criado_por, 1
+            WHERE NEW.status = 'Pendente' AND NEW.criado_por IS NOT NULL
+            ON CONFLICT (nome) DO UPDATE SET valor = valor + 1;
+        END
+        """,
+    ]),
+    (5, "revisão por tabela para o autorefresh", [
+        """
+        CREATE TABLE IF NOT EXISTS revisoes (
+            tabela TEXT PRIMARY KEY,
+            revisao INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        "INSERT OR IGNORE INTO revisoes (tabela, revisao) VALUES ('pautas_trabalho', 0), ('agenda_itens', 0)",
+    ] + [
+        # Toda escrita soma 1: o painel sabe que precisa reler a tabela
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_revisao_{tabela}_{sufixo} AFTER {evento} ON {tabela}
+        BEGIN
+            UPDATE revisoes SET revisao = revisao + 1 WHERE tabela = '{tabela}';
+        END
+        """
+        for tabela in ("pautas_trabalho", "agenda_itens")
+        for evento, sufixo in (("INSERT", "ins"), ("UPDATE", "upd"), ("DELETE", "del"))
+    ]),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+def versao_banco(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrar(conn: sqlite3.Connection) -> list:
+    """Aplica as migrações pendentes; devolve as versões aplicadas agora."""
+    if versao_banco(conn) >= VERSAO_ATUAL:
+        return []
+    aplicadas = []
+    for versao, _descricao, comandos in MIGRACOES:
+        # BEGIN IMMEDIATE trava a escrita: outro processo migrando ao mesmo tempo espera
+        # e, ao entrar, vê a versão já atualizada
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if versao_banco(conn) >= versao:
+                conn.rollback()
+                continue
+            for sql in comandos:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {int(versao)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        aplicadas.append(versao)
+    if aplicadas:
+        conn.execute("PRAGMA optimize")
+    return aplicadas
@@ -0,0 +1,124 @@
+"""Pré-geração das artes das últimas matérias, em segundo plano.
+
+Quando a lista de notícias atualiza, cada matéria nova é baixada (HTML e
+foto) e tem FEED e STORY renderizados com o título sugerido no painel, no
+perfil de prévia. Ao clicar na manchete a prévia já está no cache de artes.
+Uma thread só, com orçamento de CPU e de banda para não disputar com o uso
+interativo.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import artes
+from medicao import etapa
+
+PRE_ATIVO = os.getenv("DT_PRE_RENDER", "1") != "0"
+PRE_MAX_MATERIAS = int(os.getenv("DT_PRE_MAX", "12"))
+PRE_FRACAO_CPU = float(os.getenv("DT_PRE_CPU", "0.5"))          # fração do tempo em que a thread pode renderizar
+PRE_BANDA_KBPS = float(os.getenv("DT_PRE_BANDA_KBPS", "2048"))  # 0 = sem limite
+PRE_ESPERA_FALHA = 600                                          # segundos antes de tentar de novo uma matéria com erro
+
+class PreRenderizador:
+    """Fila de URLs para pré-gerar, consumida por uma thread daemon."""
+
+    def __init__(self, max_materias: int, fracao_cpu: float, banda_kbps: float):
+        self.max_materias = max_materias
+        self.fracao_cpu = min(max(fracao_cpu, 0.05), 1.0)
+        self.banda_kbps = banda_kbps
+        self._fila = deque()
+        self._pendentes = set()
+        self._falhas = {}
+        self._prontas = {}          # url -> título usado nas prévias
+        self._cond = threading.Condition()
+        self._thread = None
+        self._contadores = {"prontas": 0, "falhas": 0}
+
+    def agendar(self, urls):
+        """Enfileira as URLs ainda sem prévia pronta; barato para chamar a cada rerun."""
+        agora = time.monotonic()
+        urls = list(urls)[:self.max_materias]
+        with self._cond:
+            self._prontas = {u: t for u, t in self._prontas.items() if u in urls}
+            for url in urls:
+                if url in self._pendentes or artes.materia_em_cache(url) is not None or self._previas_prontas(url):
+                    continue
+                if agora - self._falhas.get(url, -PRE_ESPERA_FALHA) < PRE_ESPERA_FALHA:
+                    continue
+                self._fila.append(url)
+                self._pendentes.add(url)
+            if self._fila:
+                self._cond.notify()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._laco, name="pre-render", daemon=True)
+                self._thread.start()
+
+    def _previas_prontas(self, url: str) -> bool:
+        # As prévias valem horas no cache de artes: sem isso a matéria seria baixada de novo
+        # sempre que a imagem decodificada expirasse
+        titulo = self._prontas.get(url)
+        if titulo is None:
+            return False
+        if all(artes.arte_em_cache(url, tipo, titulo, perfil="previa") for tipo in ("FEED", "STORY")):
+            return True
+        del self._prontas[url]
+        return False
+
+    def estatisticas(self) -> dict:
+        with self._cond:
+            return dict(self._contadores, na_fila=len(self._fila))
+
+    def _laco(self):
+        while True:
+            with self._cond:
+                while not self._fila:
+                    self._cond.wait()
+                url = self._fila.popleft()
+            try:
+                titulo = self._preparar(url)
+                sucesso = True
+            except Exception:
+                sucesso = False
+            with self._cond:
+                self._pendentes.discard(url)
+                if sucesso:
+                    self._prontas[url] = titulo
+                    self._contadores["prontas"] += 1
+                    self._falhas.pop(url, None)
+                else:
+                    self._contadores["falhas"] += 1
+                    self._falhas[url] = time.monotonic()
+
+    def _preparar(self, url: str) -> str:
+        t0 = time.monotonic()
+        with etapa("pre.download"):
+            meta = artes.obter_metadados(url)
+            if not meta.img_url:
+                raise ValueError("Não foi encontrada uma imagem válida na matéria.")
+            dados = artes.safe_get_bytes(meta.img_url)
+        self._respeitar_banda(len(dados), time.monotonic() - t0)
+
+        c0 = time.thread_time()
+        with etapa("pre.render"):
+            artes.garantir_fonte()
+            materia = artes.montar_materia(url, meta, dados)
+            # Mesmo título que o painel sugere na caixa de edição: a chave da prévia bate
+            for tipo in ("FEED", "STORY"):
+                artes.arte_da_materia(materia, tipo, meta.titulo_limpo, perfil="previa", guardar_render=False)
+        self._respeitar_cpu(time.thread_time() - c0)
+        return meta.titulo_limpo
+
+    def _respeitar_banda(self, n_bytes: int, gasto: float):
+        if self.banda_kbps > 0:
+            time.sleep(max(0.0, n_bytes / (self.banda_kbps * 1024) - gasto))
+
+    def _respeitar_cpu(self, cpu: float):
+        # Descansa o bastante para a renderização ocupar só a fração configurada
+        time.sleep(cpu * (1 / self.fracao_cpu - 1))
+
+PRE_RENDERIZADOR = PreRenderizador(PRE_MAX_MATERIAS, PRE_FRACAO_CPU, PRE_BANDA_KBPS)
+
+def pre_renderizar(urls):
+    if PRE_ATIVO:
+        PRE_RENDERIZADOR.agendar(urls)